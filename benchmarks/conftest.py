@@ -0,0 +1,231 @@
+"""Reusable benchmarking fixtures for acronyms."""
+
+
+import io
+import itertools
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from _pytest.fixtures import SubRequest
+from _pytest.terminal import TerminalReporter
+from fastapi.testclient import TestClient
+from pydantic import PostgresDsn
+import pytest
+from pytest import Config, Parser, Session, StashKey, TempPathFactory
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_postgresql.janitor import DatabaseJanitor
+
+from benchmarks import util
+from benchmarks.util import Dataset
+from tests import util as test_util
+
+
+Summary = Dict[str, float]
+REGRESSIONS = StashKey[List[str]]()
+SUMMARIES = StashKey[Dict[str, Summary]]()
+
+
+def baseline_path(config: Config, name: str) -> Path:
+    """Locate saved latency baseline by name."""
+    return config.rootpath / ".benchmarks" / "baselines" / f"{name}.json"
+
+
+@pytest.fixture(scope="session")
+def dataset(
+    request: SubRequest, tmp_path_factory: TempPathFactory
+) -> Iterator[Dataset]:
+    """
+    Application started over a database of synthetic acronyms.
+
+    Database kind and size are parametrized from command line options. Each
+    dataset is loaded once with the bulk importer and shared by every
+    benchmark of the session.
+    """
+    from acronyms import indexes, loader
+
+    database, size = request.param
+    directory = tmp_path_factory.mktemp(database)
+    settings = test_util.mock_settings().model_copy(
+        update={
+            "search_typo_index": True,
+            "search_word_index": True,
+            "smtp_enabled": False,
+        }
+    )
+    if database == "postgresql":
+        process = request.getfixturevalue("postgresql_proc")
+        name = f"acronyms_{size}"
+        janitor = DatabaseJanitor(
+            process.user,
+            process.host,
+            process.port,
+            name,
+            process.version,
+            process.password,
+        )
+        janitor.init()
+        request.addfinalizer(janitor.drop)
+        uri = (
+            f"postgresql+asyncpg://{process.user}:{process.password or ''}@"
+            f"{process.host}:{process.port}/{name}"
+        )
+        settings = settings.model_copy(update={"database": PostgresDsn(uri)})
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("acronyms.settings.settings", lambda: settings)
+        from acronyms.main import app
+
+        with TestClient(app) as client:
+            portal = test_util.portal(client)
+            path = util.write(directory / "acronyms.ndjson", size)
+            portal.call(loader.load, path, "ndjson", 10000, io.StringIO())
+            portal.call(indexes.initialize)
+            sample = next(util.generate(1))
+            yield Dataset(client, database, size, sample)
+
+
+@pytest.fixture
+def measure(
+    benchmark: BenchmarkFixture, request: SubRequest
+) -> Callable[..., Any]:
+    """
+    Time a callable over rounds and record its latency percentiles.
+
+    Setup runs untimed before each round and may instead return arguments for
+    the callable, as in pytest-benchmark pedantic mode.
+    """
+
+    def measure_(
+        target: Callable[..., Any],
+        args: Sequence[Any] = (),
+        setup: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        rounds = request.config.getoption("--rounds")
+        result = benchmark.pedantic(
+            target,
+            args=tuple(args),
+            setup=setup,
+            rounds=rounds,
+            warmup_rounds=1,
+        )
+        if benchmark.stats is not None:
+            summary = util.summarize(benchmark.stats.stats.data)
+            benchmark.extra_info.update(summary)
+            request.config.stash[SUMMARIES][request.node.nodeid] = summary
+        return result
+
+    return measure_
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """Add CLI flag options to benchmark suite."""
+    parser.addoption(
+        "--baseline-compare",
+        help="Name of saved baseline to check latencies against",
+    )
+    parser.addoption(
+        "--baseline-save",
+        help="Name under which to save latencies as a baseline",
+    )
+    parser.addoption(
+        "--baseline-tolerance",
+        default=20.0,
+        help="Percentage by which latencies may exceed the baseline",
+        type=float,
+    )
+    parser.addoption(
+        "--databases",
+        default="sqlite",
+        help="Comma separated database kinds among sqlite and postgresql",
+    )
+    parser.addoption(
+        "--rounds",
+        default=100,
+        help="Number of timed rounds per benchmark",
+        type=int,
+    )
+    parser.addoption(
+        "--sizes",
+        default="10000",
+        help="Comma separated numbers of synthetic acronyms",
+    )
+
+
+def pytest_configure(config: Config) -> None:
+    """Prepare storage for latency summaries."""
+    regressions: List[str] = []
+    summaries: Dict[str, Summary] = {}
+    config.stash[REGRESSIONS] = regressions
+    config.stash[SUMMARIES] = summaries
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """Parametrize datasets by database kind and size."""
+    if "dataset" in metafunc.fixturenames:
+        databases = metafunc.config.getoption("--databases").split(",")
+        sizes = metafunc.config.getoption("--sizes").split(",")
+        params = [
+            (database, int(size))
+            for database, size in itertools.product(databases, sizes)
+        ]
+        metafunc.parametrize(
+            "dataset",
+            params,
+            ids=[f"{database}-{size}" for database, size in params],
+            indirect=True,
+            scope="session",
+        )
+
+
+def pytest_sessionfinish(session: Session) -> None:
+    """Save latency baseline and fail on regressions against another."""
+    config = session.config
+    summaries = config.stash[SUMMARIES]
+    name = config.getoption("--baseline-compare")
+    if name is not None:
+        baseline = json.loads(baseline_path(config, name).read_text())
+        tolerance = 1 + config.getoption("--baseline-tolerance") / 100
+        regressions = config.stash[REGRESSIONS]
+        for nodeid, summary in summaries.items():
+            previous = baseline.get(nodeid)
+            if previous is None:
+                continue
+            for field in ["p50", "p95", "p99"]:
+                if summary[field] > previous[field] * tolerance:
+                    regressions.append(
+                        f"{nodeid} {field} {1000 * summary[field]:.3f} ms "
+                        f"exceeds baseline {1000 * previous[field]:.3f} ms"
+                    )
+        if regressions:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    name = config.getoption("--baseline-save")
+    if name is not None:
+        path = baseline_path(config, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(summaries, indent=2, sort_keys=True))
+
+
+def pytest_terminal_summary(
+    terminalreporter: TerminalReporter, config: Config
+) -> None:
+    """Report latency percentiles, throughput and regressions."""
+    summaries = config.stash[SUMMARIES]
+    if not summaries:
+        return
+
+    terminalreporter.section("latency percentiles")
+    width = max(len(nodeid) for nodeid in summaries)
+    terminalreporter.write_line(
+        f"{'Name':<{width}} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+        f"{'p99 (ms)':>10} {'ops/s':>10}"
+    )
+    for nodeid, summary in summaries.items():
+        terminalreporter.write_line(
+            f"{nodeid:<{width}} {1000 * summary['p50']:>10.3f} "
+            f"{1000 * summary['p95']:>10.3f} {1000 * summary['p99']:>10.3f} "
+            f"{summary['ops']:>10.1f}"
+        )
+    for regression in config.stash[REGRESSIONS]:
+        terminalreporter.write_line(regression, red=True)
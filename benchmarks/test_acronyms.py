@@ -0,0 +1,152 @@
+"""Latency benchmarks for acronym routes."""
+
+
+import itertools
+from typing import Any, Callable, Dict
+
+from fastapi_cache import FastAPICache
+import httpx
+import pytest
+
+from benchmarks.util import Dataset
+from tests import util as test_util
+
+
+Measure = Callable[..., Any]
+counter = itertools.count()
+
+
+def clear(dataset: Dataset) -> None:
+    """Empty response cache so that requests reach the database."""
+    test_util.portal(dataset.client).call(FastAPICache.clear)
+
+
+def get(dataset: Dataset, url: str, params: Dict[str, Any]) -> httpx.Response:
+    """Request acronyms and check for success."""
+    response = dataset.client.get(url, params=params)
+    response.raise_for_status()
+    return response
+
+
+def test_delete(dataset: Dataset, measure: Measure) -> None:
+    """Delete an acronym inserted before each round."""
+
+    def setup() -> Any:
+        body = {"abbreviation": "DEL", "phrase": f"Deleted {next(counter)}"}
+        response = dataset.client.post("/api/acronym", json=body)
+        response.raise_for_status()
+        return (response.json(),), {}
+
+    def delete(id_: int) -> None:
+        dataset.client.delete(f"/api/acronym/{id_}").raise_for_status()
+
+    measure(delete, setup=setup)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["miss", "hit"])
+def test_get_abbreviation(
+    dataset: Dataset, measure: Measure, cached: bool
+) -> None:
+    """Find acronyms by abbreviation with and without the response cache."""
+    params = {"abbreviation": dataset.sample["abbreviation"]}
+    get(dataset, "/api/acronym", params)
+    setup = None if cached else lambda: clear(dataset)
+    measure(get, setup=setup, args=(dataset, "/api/acronym", params))
+
+
+@pytest.mark.parametrize("total", ["approximate", "exact"])
+def test_get_count(dataset: Dataset, measure: Measure, total: str) -> None:
+    """Count acronyms matching a common phrase word."""
+    word = str(dataset.sample["phrase"]).split()[0]
+    params = {"phrase": word, "total": total}
+    measure(
+        get,
+        setup=lambda: clear(dataset),
+        args=(dataset, "/api/acronym", params),
+    )
+
+
+def test_get_cursor(dataset: Dataset, measure: Measure) -> None:
+    """Page deep into acronyms by cursor."""
+    params = {"offset": dataset.size // 2}
+    cursor = get(dataset, "/api/acronym", params).headers["X-Next-Cursor"]
+    measure(
+        get,
+        setup=lambda: clear(dataset),
+        args=(dataset, "/api/acronym", {"cursor": cursor}),
+    )
+
+
+def test_get_fuzzy(dataset: Dataset, measure: Measure) -> None:
+    """Find acronyms by abbreviation allowing for typos."""
+    abbreviation = str(dataset.sample["abbreviation"])
+    params = {"abbreviation": abbreviation[1:], "fuzzy": True}
+    measure(
+        get,
+        setup=lambda: clear(dataset),
+        args=(dataset, "/api/acronym", params),
+    )
+
+
+def test_get_offset(dataset: Dataset, measure: Measure) -> None:
+    """Page deep into acronyms by offset."""
+    params = {"offset": dataset.size // 2}
+    measure(
+        get,
+        setup=lambda: clear(dataset),
+        args=(dataset, "/api/acronym", params),
+    )
+
+
+def test_get_phrase(dataset: Dataset, measure: Measure) -> None:
+    """Find acronyms by phrase."""
+    params = {"phrase": dataset.sample["phrase"]}
+    measure(
+        get,
+        setup=lambda: clear(dataset),
+        args=(dataset, "/api/acronym", params),
+    )
+
+
+def test_get_search(dataset: Dataset, measure: Measure) -> None:
+    """Rank acronyms by relevance to phrase words."""
+    words = str(dataset.sample["phrase"]).split()[:2]
+    params = {"query": " ".join(words)}
+    measure(get, args=(dataset, "/api/acronym/search", params))
+
+
+def test_get_suggest(dataset: Dataset, measure: Measure) -> None:
+    """Complete an abbreviation prefix."""
+    params = {"prefix": str(dataset.sample["abbreviation"])[:2]}
+    measure(get, args=(dataset, "/api/acronym/suggest", params))
+
+
+def test_post(dataset: Dataset, measure: Measure) -> None:
+    """Insert a new acronym."""
+
+    def setup() -> Any:
+        body = {"abbreviation": "NEW", "phrase": f"Inserted {next(counter)}"}
+        return (body,), {}
+
+    def post(body: Dict[str, str]) -> None:
+        dataset.client.post("/api/acronym", json=body).raise_for_status()
+
+    measure(post, setup=setup)
+
+
+def test_put(dataset: Dataset, measure: Measure) -> None:
+    """Update an existing acronym."""
+    body = {"abbreviation": "PUT", "phrase": "Updated 0"}
+    response = dataset.client.post("/api/acronym", json=body)
+    response.raise_for_status()
+    id_ = response.json()
+
+    def setup() -> Any:
+        body = {"abbreviation": "PUT", "phrase": f"Updated {next(counter)}"}
+        return (body,), {}
+
+    def put(body: Dict[str, str]) -> None:
+        response = dataset.client.put(f"/api/acronym/{id_}", json=body)
+        response.raise_for_status()
+
+    measure(put, setup=setup)
@@ -0,0 +1,48 @@
+"""Latency benchmarks for authentication."""
+
+
+import secrets
+from typing import Any, Callable, Dict
+
+import pytest
+
+from acronyms import auth
+from benchmarks.util import Dataset
+from tests import util as test_util
+
+
+@pytest.fixture(scope="module")
+def headers(dataset: Dataset) -> Dict[str, str]:
+    """Get authorization headers for a new user."""
+    email = f"{secrets.token_hex(8)}@mail.com"
+    password = secrets.token_urlsafe(32)
+    body = {"email": email, "password": password}
+    dataset.client.post("/auth/register", json=body).raise_for_status()
+
+    response = dataset.client.post(
+        "/auth/login",
+        data={"username": email, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["miss", "hit"])
+def test_get_profile(
+    dataset: Dataset,
+    headers: Dict[str, str],
+    measure: Callable[..., Any],
+    cached: bool,
+) -> None:
+    """Resolve access token to its user with and without the token cache."""
+
+    def get() -> None:
+        response = dataset.client.get("/users/me", headers=headers)
+        response.raise_for_status()
+
+    def setup() -> None:
+        test_util.portal(dataset.client).call(auth.clear_tokens)
+
+    get()
+    measure(get, setup=None if cached else setup)
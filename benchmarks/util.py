@@ -0,0 +1,114 @@
+"""Synthetic datasets and latency statistics for benchmarks."""
+
+
+import itertools
+import json
+from pathlib import Path
+import random
+import statistics
+import string
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from fastapi.testclient import TestClient
+
+
+SYLLABLES = [
+    "ba",
+    "ce",
+    "di",
+    "fo",
+    "gu",
+    "ka",
+    "le",
+    "mi",
+    "no",
+    "pu",
+    "ra",
+    "se",
+    "ti",
+    "vo",
+    "za",
+]
+
+
+class Dataset(NamedTuple):
+    """Started application over a database of synthetic acronyms."""
+
+    client: TestClient
+    database: str
+    size: int
+    sample: Dict[str, Optional[str]]
+
+
+def generate(size: int, seed: int = 0) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Create synthetic acronyms whose abbreviations spell their phrases.
+
+    Phrase words are drawn from a Zipf distribution, so that a few words are
+    common as in real phrases. About a third of acronyms have a description.
+    Output is deterministic for a seed.
+    """
+    generator = random.Random(seed)
+    words = vocabulary(generator)
+    weights = {
+        letter: list(
+            itertools.accumulate(1 / rank for rank in range(1, len(group) + 1))
+        )
+        for letter, group in words.items()
+    }
+    for _ in range(size):
+        letters = generator.choices(
+            string.ascii_lowercase, k=generator.randint(2, 5)
+        )
+        phrase = [
+            generator.choices(words[letter], cum_weights=weights[letter])[0]
+            for letter in letters
+        ]
+        description = None
+        if generator.random() < 0.3:
+            description = " ".join(
+                generator.choices(
+                    [word for letter in letters for word in words[letter][:20]],
+                    k=generator.randint(4, 12),
+                )
+            )
+        yield {
+            "abbreviation": "".join(letters).upper(),
+            "description": description,
+            "phrase": " ".join(word.capitalize() for word in phrase),
+        }
+
+
+def summarize(durations: Sequence[float]) -> Dict[str, float]:
+    """Compute latency percentiles in seconds and throughput per second."""
+    cuts = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "ops": len(durations) / sum(durations),
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+    }
+
+
+def vocabulary(
+    generator: random.Random, size: int = 200
+) -> Dict[str, List[str]]:
+    """Create distinct pronounceable words grouped by first letter."""
+    words: Dict[str, List[str]] = {}
+    for letter in string.ascii_lowercase:
+        group: Dict[str, None] = {}
+        while len(group) < size:
+            length = generator.randint(1, 3)
+            group[
+                letter + "".join(generator.choices(SYLLABLES, k=length))
+            ] = None
+        words[letter] = list(group)
+    return words
+
+
+def write(path: Path, size: int) -> Path:
+    """Save synthetic acronyms as an NDJSON file."""
+    with path.open("w", encoding="utf-8") as file:
+        for acronym in generate(size):
+            file.write(json.dumps(acronym) + "\n")
+    return path
@@ -1,19 +1,161 @@
 """Command line interface for acronyms."""
 
 
+from argparse import ArgumentParser
+import asyncio
+from pathlib import Path
 import sys
+from typing import List
 
 from pydantic import ValidationError
 import uvicorn
 
 import acronyms
-from acronyms import settings
+from acronyms import loader, settings, traffic
+
+
+def import_acronyms(arguments: List[str]) -> None:
+    """Bulk load acronyms from a file into the configured database."""
+    parser = ArgumentParser(
+        prog="acronyms import",
+        description="Import acronyms from a CSV, JSON or NDJSON file.",
+    )
+    parser.add_argument("path", type=Path, help="Location of acronyms file")
+    parser.add_argument(
+        "--chunk-size",
+        default=10000,
+        help="Number of acronyms inserted per transaction",
+        type=int,
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "json", "ndjson"],
+        help="File format, inferred from the file extension by default",
+    )
+    options = parser.parse_args(arguments)
+
+    try:
+        inserted = asyncio.run(
+            loader.load(options.path, options.format, options.chunk_size)
+        )
+    except ValidationError as exception:
+        print("Acronyms file failed validation", file=sys.stderr)
+        print(exception, file=sys.stderr)
+        sys.exit(2)
+    print(f"Imported {inserted} acronyms")
+
+
+def load_test(arguments: List[str]) -> None:
+    """Simulate frontend traffic against a running server."""
+    parser = ArgumentParser(
+        prog="acronyms load-test",
+        description="Simulate users of the frontend against a running server "
+        "and fail if a route misses its service level objectives.",
+    )
+    defaults = traffic.Profile()
+    parser.add_argument("url", help="Base URL of server")
+    parser.add_argument(
+        "--debounce",
+        default=defaults.debounce,
+        help="Seconds of typing pause after which searches are sent",
+        type=float,
+    )
+    parser.add_argument(
+        "--duration",
+        default=defaults.duration,
+        help="Seconds during which users start browsing sessions",
+        type=float,
+    )
+    parser.add_argument(
+        "--edit-rate",
+        default=defaults.edit_rate,
+        help="Fraction of browsing sessions followed by an acronym edit",
+        type=float,
+    )
+    parser.add_argument(
+        "--keystroke",
+        default=defaults.keystroke,
+        help="Mean seconds between keystrokes",
+        type=float,
+    )
+    parser.add_argument(
+        "--login-rate",
+        default=defaults.login_rate,
+        help="Fraction of users who register and log in",
+        type=float,
+    )
+    parser.add_argument(
+        "--pages",
+        default=defaults.pages,
+        help="Maximum number of page flips after a search",
+        type=int,
+    )
+    parser.add_argument(
+        "--ramp",
+        default=defaults.ramp,
+        help="Seconds over which users start",
+        type=float,
+    )
+    parser.add_argument(
+        "--seed", help="Seed for reproducible user behavior", type=int
+    )
+    parser.add_argument(
+        "--slo-errors",
+        default=defaults.slo_errors,
+        help="Maximum percentage of failed requests per route",
+        type=float,
+    )
+    parser.add_argument(
+        "--slo-p95",
+        default=defaults.slo_p95,
+        help="Maximum 95th percentile latency in milliseconds per route",
+        type=float,
+    )
+    parser.add_argument(
+        "--slo-p99",
+        default=defaults.slo_p99,
+        help="Maximum 99th percentile latency in milliseconds per route",
+        type=float,
+    )
+    parser.add_argument(
+        "--think",
+        default=defaults.think,
+        help="Mean seconds between user actions",
+        type=float,
+    )
+    parser.add_argument(
+        "--timeout",
+        default=defaults.timeout,
+        help="Seconds after which requests fail",
+        type=float,
+    )
+    parser.add_argument(
+        "--users",
+        default=defaults.users,
+        help="Number of concurrent virtual users",
+        type=int,
+    )
+    options = vars(parser.parse_args(arguments))
+    url, seed = options.pop("url"), options.pop("seed")
+
+    profile = traffic.Profile(**options)
+    report = asyncio.run(traffic.run(url, profile, seed))
+    print(report.render())
+    breaches = report.breaches(profile)
+    for breach in breaches:
+        print(breach, file=sys.stderr)
+    if breaches:
+        sys.exit(1)
 
 
 def main() -> None:
     """Pass command line arguments to uvicorn."""
     arguments = sys.argv[1:]
-    if "--help" in arguments:
+    commands = {"import": import_acronyms, "load-test": load_test}
+    if arguments[:1] and arguments[0] in commands:
+        commands[arguments[0]](arguments[1:])
+        sys.exit(0)
+    elif "--help" in arguments:
         uvicorn.main(["acronyms.main:app", *arguments])
     elif "--version" in arguments:
         print(f"Acronyms {acronyms.__version__}")
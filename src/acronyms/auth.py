@@ -1,11 +1,18 @@
 """Authentication management."""
 
 
-from typing import AsyncIterator, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from fastapi import Depends, FastAPI, Request
-from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
+from fastapi_cache import FastAPICache
+from fastapi_users import (
+    BaseUserManager,
+    FastAPIUsers,
+    UUIDIDMixin,
+    exceptions,
+)
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
@@ -15,18 +22,102 @@ from fastapi_users.authentication.strategy.db import (
     DatabaseStrategy,
 )
 from fastapi_users.db import SQLAlchemyUserDatabase
+import orjson
 
-from acronyms import mail, models, settings
+from acronyms import cache, mail, models, settings
 from acronyms.models import AccessToken, User
 from acronyms.schemas import UserCreate, UserRead, UserUpdate
 
 
+USER_FIELDS = ("email", "id", "is_active", "is_superuser", "is_verified")
+
+
+class CachedDatabaseStrategy(DatabaseStrategy[User, UUID, AccessToken]):
+    """
+    Database strategy that caches users of validated access tokens.
+
+    Cached users are detached copies without password hashes, so they are only
+    served to requests with safe methods, which never write users back.
+    """
+
+    def __init__(
+        self,
+        database: AccessTokenDatabase[AccessToken],
+        lifetime_seconds: int,
+        cached: bool = True,
+    ) -> None:
+        """Create strategy that reads from the token cache if cached."""
+        super().__init__(database, lifetime_seconds)
+        self.cached = cached
+        self.lifetime = timedelta(seconds=lifetime_seconds)
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        """Delete access token and its cache entry."""
+        await super().destroy_token(token, user)
+        await FastAPICache.get_backend().clear(key=token_key(token))
+
+    async def read_token(
+        self,
+        token: Optional[str],
+        user_manager: BaseUserManager[User, UUID],
+    ) -> Optional[User]:
+        """
+        Find active user of an access token.
+
+        Users are cached for the token cache lifetime, but never past the
+        expiration of their token.
+        """
+        if token is None:
+            return None
+
+        backend = FastAPICache.get_backend()
+        counter = cache.route_counters().setdefault(
+            "access_tokens", cache.Counter()
+        )
+        key = token_key(token)
+        if self.cached:
+            value = await backend.get(key)
+            if value is not None:
+                counter.hits += 1
+                fields = orjson.loads(value)
+                return User(**{**fields, "id": UUID(fields["id"])})
+            counter.misses += 1
+
+        now = datetime.now(timezone.utc)
+        access_token = await self.database.get_by_token(
+            token, now - self.lifetime
+        )
+        if access_token is None:
+            return None
+        try:
+            user = await user_manager.get(
+                user_manager.parse_id(access_token.user_id)
+            )
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+        remaining = access_token.created_at + self.lifetime - now
+        expire = min(
+            settings.settings().token_cache_ttl, int(remaining.total_seconds())
+        )
+        if expire > 0:
+            fields = {field: getattr(user, field) for field in USER_FIELDS}
+            await backend.set(key, orjson.dumps(fields).decode(), expire)
+        return user
+
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
     """User database manager."""
 
     reset_password_token_secret = settings.settings().reset_token
     verification_token_secret = settings.settings().verification_token
 
+    async def on_after_delete(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        """Forget cached access tokens after deleting user."""
+        await clear_tokens()
+
     async def on_after_register(
         self, user: User, request: Optional[Request] = None
     ) -> None:
@@ -40,21 +131,60 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         https://notareallink.com/verify?user=fjdskj
         """
         if settings.settings().smtp_enabled:
-            mail.sender().send(
+            message = mail.sender().get_message(
                 subject="Welcome to Acronyms",
                 sender=settings.settings().smtp_username,
                 receivers=[user.email],
                 text=text,
             )
+            await mail.dispatcher().send(message)
+
+    async def on_after_reset_password(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        """Forget cached access tokens after resetting user password."""
+        await clear_tokens()
+
+    async def on_after_update(
+        self,
+        user: User,
+        update_dict: Dict[str, Any],
+        request: Optional[Request] = None,
+    ) -> None:
+        """Forget cached access tokens after updating user."""
+        await clear_tokens()
+
+    async def on_after_verify(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        """Forget cached access tokens after verifying user."""
+        await clear_tokens()
+
+
+async def clear_tokens() -> None:
+    """
+    Remove every cached access token.
+
+    User changes are rare, so clearing all tokens avoids tracking which tokens
+    belong to which user.
+    """
+    await FastAPICache.get_backend().clear(
+        namespace=f"{FastAPICache.get_prefix()}:tokens"
+    )
 
 
 def get_database_strategy(
+    request: Request,
     access_token_db: AccessTokenDatabase[AccessToken] = Depends(
         models.get_tokens
     ),
 ) -> DatabaseStrategy:
     """Load authentication strategy."""
-    return DatabaseStrategy(access_token_db, lifetime_seconds=3600)
+    return CachedDatabaseStrategy(
+        access_token_db,
+        lifetime_seconds=3600,
+        cached=request.method in models.SAFE_METHODS,
+    )
 
 
 async def get_user_manager(
@@ -88,6 +218,11 @@ def include_routes(app: FastAPI) -> None:
     )
 
 
+def token_key(token: str) -> str:
+    """Create cache key for an access token without storing the token."""
+    return cache.build_key("tokens", "user", {"token": token})
+
+
 transport = BearerTransport(tokenUrl="auth/login")
 backend = AuthenticationBackend(
     name="database",
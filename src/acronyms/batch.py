@@ -0,0 +1,199 @@
+"""Bulk application of mixed acronym mutations."""
+
+
+from typing import Any, Dict, List, Sequence, Tuple, cast
+import uuid
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from acronyms import search
+from acronyms.cache import Change
+from acronyms.models import Acronym
+from acronyms.schemas import (
+    AcronymDelete,
+    AcronymInsert,
+    AcronymOperation,
+    AcronymResult,
+    AcronymUpdate,
+)
+
+
+class Plan:
+    """
+    Outcomes of batch operations decided against the acronyms they touch.
+
+    Deciding outcomes up front lets accepted operations be written with one
+    statement per action.
+    """
+
+    def __init__(self, rows: Dict[int, Change]) -> None:
+        """Create plan from current values of touched acronyms."""
+        self.changes: List[Change] = []
+        self.deletes: List[int] = []
+        self.inserts: Dict[int, Dict[str, Any]] = {}
+        self.original = dict(rows)
+        self.pairs = {
+            (row.abbreviation, row.phrase): row.id for row in rows.values()
+        }
+        self.results: List[AcronymResult] = []
+        self.rows = rows
+        self.updates: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, operation: AcronymOperation) -> None:
+        """Decide outcome of the next operation."""
+        if isinstance(operation, AcronymDelete):
+            result = self.delete(operation)
+        elif isinstance(operation, AcronymInsert):
+            result = self.insert(operation)
+        else:
+            result = self.update(operation)
+        self.results.append(result)
+
+    def blocking(self) -> List[int]:
+        """
+        Find updated acronyms whose current values another update takes.
+
+        The unique constraint is checked row by row, so such acronyms must
+        give up their values before the other updates run, even though the
+        final values are distinct.
+        """
+        targets = {
+            (values["abbreviation"], values["phrase"]): id_
+            for id_, values in self.updates.items()
+        }
+        blocking = []
+        for id_ in self.updates:
+            row = self.original[id_]
+            if targets.get((row.abbreviation, row.phrase), id_) != id_:
+                blocking.append(id_)
+        return blocking
+
+    def delete(self, operation: AcronymDelete) -> AcronymResult:
+        """Remove acronym if it exists."""
+        row = self.rows.pop(operation.id, None)
+        if row is None:
+            return AcronymResult(status="not_found")
+
+        del self.pairs[(row.abbreviation, row.phrase)]
+        self.changes.append(row)
+        self.deletes.append(operation.id)
+        # Deleted rows must not be updated, since bulk updates by primary key
+        # expect every row to exist.
+        self.updates.pop(operation.id, None)
+        return AcronymResult(id=operation.id, status="ok")
+
+    def insert(self, operation: AcronymInsert) -> AcronymResult:
+        """Insert acronym unless its values are taken."""
+        pair = (operation.acronym.abbreviation, operation.acronym.phrase)
+        if pair in self.pairs:
+            return AcronymResult(status="conflict")
+
+        # Negative keys stand in for ids until the database assigns them.
+        index = len(self.results)
+        self.pairs[pair] = -index - 1
+        self.inserts[index] = operation.acronym.model_dump()
+        return AcronymResult(status="ok")
+
+    def update(self, operation: AcronymUpdate) -> AcronymResult:
+        """Replace acronym if it exists and its new values are free."""
+        row = self.rows.get(operation.id)
+        pair = (operation.acronym.abbreviation, operation.acronym.phrase)
+        if row is None:
+            return AcronymResult(status="not_found")
+        elif self.pairs.get(pair, operation.id) != operation.id:
+            return AcronymResult(id=operation.id, status="conflict")
+
+        del self.pairs[(row.abbreviation, row.phrase)]
+        self.pairs[pair] = operation.id
+        self.rows[operation.id] = Change(operation.id, *pair)
+        self.changes.extend([row, self.rows[operation.id]])
+        self.updates[operation.id] = {
+            "id": operation.id,
+            **operation.acronym.model_dump(),
+        }
+        return AcronymResult(id=operation.id, status="ok")
+
+
+async def apply(
+    session: AsyncSession, operations: Sequence[AcronymOperation]
+) -> Tuple[List[AcronymResult], List[Change]]:
+    """
+    Apply operations in order within the session transaction.
+
+    Operations that conflict with the unique constraint or reference missing
+    acronyms are skipped. Returns the result of each operation and the acronym
+    changes for cache invalidation.
+    """
+    # Planned acronyms are read on the primary engine, so that the read
+    # connections of tuned SQLite cannot hand out rows that writes have
+    # already removed.
+    session.info["writing"] = True
+    plan = Plan(await load(session, operations))
+    for operation in operations:
+        plan.add(operation)
+
+    if plan.deletes:
+        await session.execute(
+            sqlalchemy.delete(Acronym).where(Acronym.id.in_(plan.deletes))
+        )
+    blocking = plan.blocking()
+    if blocking:
+        # Unique placeholder phrases free the values for other updates, which
+        # then apply in any order.
+        await session.execute(
+            sqlalchemy.update(Acronym),
+            [{"id": id_, "phrase": str(uuid.uuid4())} for id_ in blocking],
+        )
+    if plan.updates:
+        await session.execute(
+            sqlalchemy.update(Acronym), list(plan.updates.values())
+        )
+    if plan.inserts:
+        ids = await session.scalars(
+            sqlalchemy.insert(Acronym).returning(
+                Acronym.id, sort_by_parameter_order=True
+            ),
+            list(plan.inserts.values()),
+        )
+        for (index, values), id_ in zip(plan.inserts.items(), ids):
+            plan.results[index].id = id_
+            plan.changes.append(
+                Change(cast(int, id_), values["abbreviation"], values["phrase"])
+            )
+
+    await search.index_acronyms(session, [change.id for change in plan.changes])
+    return plan.results, plan.changes
+
+
+async def load(
+    session: AsyncSession, operations: Sequence[AcronymOperation]
+) -> Dict[int, Change]:
+    """Load acronyms referenced by operations or holding their new values."""
+    ids = [
+        operation.id
+        for operation in operations
+        if not isinstance(operation, AcronymInsert)
+    ]
+    pairs = [
+        (operation.acronym.abbreviation, operation.acronym.phrase)
+        for operation in operations
+        if not isinstance(operation, AcronymDelete)
+    ]
+
+    conditions = []
+    if ids:
+        conditions.append(Acronym.id.in_(ids))
+    if pairs:
+        conditions.append(
+            sqlalchemy.tuple_(Acronym.abbreviation, Acronym.phrase).in_(pairs)
+        )
+    if not conditions:
+        return {}
+
+    result = await session.execute(
+        sqlalchemy.select(
+            Acronym.id, Acronym.abbreviation, Acronym.phrase
+        ).where(sqlalchemy.or_(*conditions))
+    )
+    return {row[0]: Change(*row) for row in result}
@@ -0,0 +1,952 @@
+"""Response caching with dependency tracked invalidation."""
+
+
+import abc
+import asyncio
+from collections import OrderedDict
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import re
+import sys
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from fastapi import HTTPException, Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+import orjson
+from pydantic import BaseModel, computed_field
+import redis.asyncio
+from redis.asyncio import Redis
+import redis.exceptions
+
+from acronyms import fuzzy, search, settings
+from acronyms.models import Acronym
+from acronyms.responses import ContentResponse
+
+
+Key = Tuple[str, Any]
+logger = logging.getLogger(__name__)
+# Length of the search term prefixes that index cache entries.
+GRAM_LENGTH = 3
+Result = TypeVar("Result")
+Route = Callable[..., Awaitable[Result]]
+
+
+class Change(NamedTuple):
+    """Acronym values before or after a write."""
+
+    id: int  # noqa: A003
+    abbreviation: str
+    phrase: str
+
+    @classmethod
+    def of(cls, acronym: Acronym) -> "Change":
+        """Capture current values of an acronym."""
+        return cls(
+            cast(int, acronym.id),
+            cast(str, acronym.abbreviation),
+            cast(str, acronym.phrase),
+        )
+
+
+class Counter(BaseModel):
+    """Cache lookup statistics."""
+
+    evictions: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Dependencies(BaseModel):
+    """
+    Acronyms which a cached response depends on.
+
+    Listings depend on every acronym that could match their search filters,
+    in addition to the acronyms they contain. Fuzzy listings also depend on
+    abbreviations within their edit distance.
+    """
+
+    abbreviation: Optional[str] = None
+    distance: int = 0
+    ids: Set[int] = set()
+    listing: bool = False
+    phrase: Optional[str] = None
+
+    def affected_by(self, change: Change) -> bool:
+        """Check whether an acronym write could change the cached response."""
+        if change.id in self.ids:
+            return True
+        elif not self.listing:
+            return False
+        elif self.abbreviation is None and self.phrase is None:
+            return True
+
+        return (
+            self.abbreviation is not None
+            and (
+                matches(self.abbreviation, change.abbreviation)
+                or fuzzy.osa_distance(
+                    self.abbreviation.lower(),
+                    change.abbreviation.lower(),
+                    self.distance,
+                )
+                <= self.distance
+            )
+        ) or (self.phrase is not None and matches(self.phrase, change.phrase))
+
+    def buckets(self) -> Set[str]:
+        """
+        Get index buckets under which every affecting write is found.
+
+        Writes are found under their id and each substring of up to three
+        characters of their values. Search terms only match values containing
+        the start of their longest word, and fuzzy abbreviations share a
+        character with terms longer than the edit distance. Other listings go
+        in a bucket that every write checks.
+        """
+        buckets = {f"id:{id_}" for id_ in self.ids}
+        if not self.listing:
+            return buckets
+        elif self.abbreviation is None and self.phrase is None:
+            return buckets | {"all"}
+
+        for term, distance in [
+            (self.abbreviation, self.distance),
+            (self.phrase, 0),
+        ]:
+            if term is None:
+                continue
+            term_ = term.lower()
+            words = re.findall(r"\w+", term_)
+            if "%" in term_ or "_" in term_ or len(term_) <= distance:
+                buckets.add("all")
+            elif distance > 0:
+                buckets.update(f"gram:{character}" for character in term_)
+            else:
+                word = max(words, key=len) if words else term_
+                buckets.add(f"gram:{word[:GRAM_LENGTH]}")
+        return buckets
+
+
+class Registration(BaseModel):
+    """Dependencies of a cache entry until its expiration time."""
+
+    dependencies: Dependencies
+    expiration: float
+
+
+class Registry(abc.ABC):
+    """
+    Index from cache keys to the dependencies of their responses.
+
+    Registries also keep the data version, which increases with every acronym
+    write. Versions start from the clock, so that they keep increasing across
+    restarts. Only versions of shared registries see the writes of every
+    replica and import.
+    """
+
+    shared = False
+
+    @abc.abstractmethod
+    async def bump_version(self) -> None:
+        """Increase data version after acronym writes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def pop_affected(self, changes: Iterable[Change]) -> List[str]:
+        """Remove and return keys of entries affected by acronym writes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def register(
+        self, key: str, dependencies: Dependencies, expire: int
+    ) -> None:
+        """Record dependencies of a cache entry."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def version(self) -> int:
+        """Get current data version."""
+        raise NotImplementedError
+
+
+class MemoryRegistry(Registry):
+    """Registry kept in process memory."""
+
+    def __init__(self) -> None:
+        """Create empty registry."""
+        self.buckets: Dict[str, Set[str]] = {}
+        self.data_version = time.time_ns()
+        self.entries: Dict[str, Registration] = {}
+
+    async def bump_version(self) -> None:
+        """Increase data version after acronym writes."""
+        self.data_version += 1
+
+    def discard(self, key: str) -> None:
+        """Forget entry, if registered, and remove it from its index buckets."""
+        registration = self.entries.pop(key, None)
+        if registration is None:
+            return
+        for bucket in registration.dependencies.buckets():
+            keys = self.buckets[bucket]
+            keys.discard(key)
+            if not keys:
+                del self.buckets[bucket]
+
+    async def pop_affected(self, changes: Iterable[Change]) -> List[str]:
+        """Remove and return keys of entries affected by acronym writes."""
+        changes_ = list(changes)
+        # Entries are kept in registration order, so that expired entries
+        # are mostly at the front.
+        now = time.time()
+        while self.entries:
+            key, registration = next(iter(self.entries.items()))
+            if registration.expiration >= now:
+                break
+            self.discard(key)
+
+        candidates = {
+            key
+            for bucket in change_buckets(changes_)
+            for key in self.buckets.get(bucket, ())
+        }
+        keys = affected(
+            {key: self.entries[key] for key in sorted(candidates)}, changes_
+        )
+        for key in keys:
+            self.discard(key)
+        return keys
+
+    async def register(
+        self, key: str, dependencies: Dependencies, expire: int
+    ) -> None:
+        """Record dependencies of a cache entry."""
+        self.discard(key)
+        self.entries[key] = Registration(
+            dependencies=dependencies, expiration=time.time() + expire
+        )
+        for bucket in dependencies.buckets():
+            self.buckets.setdefault(bucket, set()).add(key)
+
+    async def version(self) -> int:
+        """Get current data version."""
+        return self.data_version
+
+
+class RedisRegistry(Registry):
+    """
+    Registry kept in Redis and shared by all application replicas.
+
+    Each registration is a Redis key that expires along with its cache entry.
+    Index buckets are Redis sets, which expire no earlier than their longest
+    lived member. Members whose registration expired are removed when a write
+    reads their bucket.
+    """
+
+    shared = True
+
+    def __init__(self, redis: Redis, name: str) -> None:
+        """Create registry stored under Redis keys starting with name."""
+        self.name = name
+        self.redis = redis
+
+    def bucket_key(self, bucket: str) -> str:
+        """Get Redis key of an index bucket."""
+        return f"{self.name}:bucket:{bucket}"
+
+    async def bump_version(self) -> None:
+        """Increase data version after acronym writes."""
+        await self.version()
+        await self.redis.incr(f"{self.name}:version")
+
+    def entry_key(self, key: str) -> str:
+        """Get Redis key of a cache entry registration."""
+        return f"{self.name}:entry:{key}"
+
+    async def pop_affected(self, changes: Iterable[Change]) -> List[str]:
+        """Remove and return keys of entries affected by acronym writes."""
+        changes_ = list(changes)
+        buckets = [
+            self.bucket_key(bucket) for bucket in change_buckets(changes_)
+        ]
+        members = await self.redis.sunion(buckets)
+        candidates = sorted(decode(cast(bytes, key)) for key in members)
+        if not candidates:
+            return []
+
+        values = await self.redis.mget(
+            [self.entry_key(key) for key in candidates]
+        )
+        entries = {
+            key: Registration.model_validate_json(value)
+            for key, value in zip(candidates, values)
+            if value is not None
+        }
+        stale = [key for key in candidates if key not in entries]
+        keys = affected(entries, changes_)
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            if stale:
+                for bucket in buckets:
+                    pipeline.srem(bucket, *stale)
+            if keys:
+                pipeline.unlink(*(self.entry_key(key) for key in keys))
+            for key in keys:
+                for bucket in entries[key].dependencies.buckets():
+                    pipeline.srem(self.bucket_key(bucket), key)
+            await pipeline.execute()
+        return keys
+
+    async def register(
+        self, key: str, dependencies: Dependencies, expire: int
+    ) -> None:
+        """Record dependencies of a cache entry."""
+        registration = Registration(
+            dependencies=dependencies, expiration=time.time() + expire
+        )
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.set(
+                self.entry_key(key), registration.model_dump_json(), ex=expire
+            )
+            for bucket in dependencies.buckets():
+                name = self.bucket_key(bucket)
+                pipeline.sadd(name, key)
+                # Expiration options need Redis 7. Together they give new sets
+                # a lifetime and only ever extend it.
+                pipeline.expire(name, expire, nx=True)
+                pipeline.expire(name, expire, gt=True)
+            await pipeline.execute()
+
+    async def version(self) -> int:
+        """Get current data version."""
+        key = f"{self.name}:version"
+        value = await self.redis.get(key)
+        if value is None:
+            await self.redis.set(key, time.time_ns(), nx=True)
+            value = await self.redis.get(key)
+        return int(cast(bytes, value))
+
+
+class MemoryBackend(Backend):
+    """
+    In process cache backend with bounded size.
+
+    Least recently used entries are evicted once either the entry count or the
+    approximate memory of keys and values exceeds its budget. The removed
+    callback receives keys of entries that are evicted, expire or are cleared.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        capacity: int,
+        removed: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Create backend holding at most size entries and capacity bytes."""
+        self.capacity = capacity
+        self.counter = Counter()
+        self.entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self.memory = 0
+        self.removed = removed
+        self.size = size
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        """Remove entries by key namespace or by key."""
+        return self.remove(namespace, key)
+
+    async def clear_keys(self, keys: Sequence[str]) -> None:
+        """Remove entries by key."""
+        for key in keys:
+            if key in self.entries:
+                self.pop(key)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get value of an unexpired entry."""
+        return (await self.get_with_ttl(key))[1]
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        """Get value and remaining lifetime of an unexpired entry."""
+        entry = self.entries.get(key)
+        now = time.time()
+        if entry is None or entry[1] <= now:
+            if entry is not None:
+                self.pop(key)
+            self.counter.misses += 1
+            return 0, None
+
+        self.entries.move_to_end(key)
+        self.counter.hits += 1
+        return int(entry[1] - now), entry[0]
+
+    def pop(self, key: str) -> None:
+        """Delete entry, release its memory and report its removal."""
+        self.release(key)
+        if self.removed is not None:
+            self.removed(key)
+
+    def release(self, key: str) -> None:
+        """Delete entry and release its memory."""
+        value, _ = self.entries.pop(key)
+        self.memory -= sys.getsizeof(key) + sys.getsizeof(value)
+
+    def remove(self, namespace: Optional[str], key: Optional[str]) -> int:
+        """Remove entries by key namespace or by key."""
+        if namespace:
+            keys = [key_ for key_ in self.entries if key_.startswith(namespace)]
+        elif key and key in self.entries:
+            keys = [key]
+        else:
+            keys = []
+
+        for key_ in keys:
+            self.pop(key_)
+        return len(keys)
+
+    async def set(  # noqa: A003
+        self, key: str, value: str, expire: Optional[int] = None
+    ) -> None:
+        """Insert entry, evicting least recently used entries if needed."""
+        if key in self.entries:
+            self.release(key)
+        # Entries without expiration would outlive every invalidation message
+        # of a tiered cache, so they are kept for at most a day.
+        self.entries[key] = (value, time.time() + (expire or 86400))
+        self.memory += sys.getsizeof(key) + sys.getsizeof(value)
+
+        while self.entries and (
+            len(self.entries) > self.size or self.memory > self.capacity
+        ):
+            self.pop(next(iter(self.entries)))
+            self.counter.evictions += 1
+
+    def stats(self) -> Dict[str, Counter]:
+        """Get lookup statistics."""
+        return {"memory": self.counter}
+
+
+class TieredBackend(Backend):
+    """
+    Per process cache in front of a shared backend.
+
+    Hot keys are answered from process memory. Clears are published on a Redis
+    channel, so that every replica evicts its local copies.
+    """
+
+    def __init__(
+        self,
+        local: MemoryBackend,
+        shared: Backend,
+        redis: Redis,
+        channel: str,
+        backoff: float = 1,
+    ) -> None:
+        """Create tiered backend that publishes clears on a Redis channel."""
+        self.backoff = backoff
+        self.channel = channel
+        self.listener: Optional[asyncio.Task] = None
+        self.local = local
+        self.redis = redis
+        self.shared = shared
+        self.shared_counter = Counter()
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        """Remove entries from both tiers on every replica."""
+        self.local.remove(namespace, key)
+        await self.redis.publish(
+            self.channel, json.dumps({"key": key, "namespace": namespace})
+        )
+        return await self.shared.clear(namespace, key)
+
+    async def clear_keys(self, keys: Sequence[str]) -> None:
+        """Remove entries by key from both tiers on every replica."""
+        await self.local.clear_keys(keys)
+        await self.redis.publish(self.channel, json.dumps({"keys": keys}))
+        await clear_keys(self.shared, keys)
+
+    async def get(self, key: str) -> Optional[str]:
+        """Get value from the first tier that has it."""
+        return (await self.get_with_ttl(key))[1]
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        """Get value and remaining lifetime from the first tier that has it."""
+        ttl, value = await self.local.get_with_ttl(key)
+        if value is not None:
+            return ttl, value
+
+        ttl, value = await self.shared.get_with_ttl(key)
+        if value is None:
+            self.shared_counter.misses += 1
+            return 0, None
+
+        self.shared_counter.hits += 1
+        value_ = decode(value)
+        # Negative TTLs mark shared entries without expiration.
+        if ttl > 0:
+            await self.local.set(key, value_, ttl)
+        return ttl, value_
+
+    async def listen(self) -> None:
+        """
+        Evict local entries cleared by any replica.
+
+        Lost subscriptions are renewed with exponential backoff. Clears
+        published in the meantime are missed, so the local tier is emptied
+        once the subscription is back.
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if attempt > 0:
+                        await self.local.clear_keys(list(self.local.entries))
+                        logger.info("Cache invalidation channel reconnected")
+                    attempt = 0
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            data = json.loads(message["data"])
+                            if "keys" in data:
+                                await self.local.clear_keys(data["keys"])
+                            else:
+                                self.local.remove(
+                                    data["namespace"], data["key"]
+                                )
+            except (OSError, redis.exceptions.RedisError) as exception:
+                logger.warning(
+                    "Cache invalidation channel failed: %s", exception
+                )
+            await asyncio.sleep(min(self.backoff * 2**attempt, 60))
+            attempt += 1
+
+    async def set(  # noqa: A003
+        self, key: str, value: str, expire: Optional[int] = None
+    ) -> None:
+        """Store value in both tiers."""
+        await self.shared.set(key, value, expire)
+        if expire:
+            await self.local.set(key, value, expire)
+
+    def start(self) -> None:
+        """Start listening for clears from other replicas."""
+        self.listener = asyncio.create_task(self.listen())
+
+    def stats(self) -> Dict[str, Counter]:
+        """Get lookup statistics of each tier."""
+        return {"local": self.local.counter, "shared": self.shared_counter}
+
+    async def stop(self) -> None:
+        """Stop listening for clears from other replicas."""
+        if self.listener is not None:
+            self.listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.listener
+            self.listener = None
+
+
+def affected(
+    entries: Dict[str, Registration], changes: Sequence[Change]
+) -> List[str]:
+    """Find keys of unexpired entries affected by acronym writes."""
+    now = time.time()
+    return [
+        key
+        for key, registration in entries.items()
+        if registration.expiration >= now
+        and any(
+            registration.dependencies.affected_by(change) for change in changes
+        )
+    ]
+
+
+def acronym_dependencies(
+    kwargs: Dict[str, Any], result: ContentResponse
+) -> Dependencies:
+    """Find dependencies of an acronym lookup or listing response."""
+    if isinstance(result.content, dict):
+        return Dependencies(ids={result.content["id"]})
+    fuzzy = kwargs.get("fuzzy", False)
+    return Dependencies(
+        abbreviation=kwargs.get("abbreviation"),
+        distance=settings.settings().search_distance if fuzzy else 0,
+        ids={acronym["id"] for acronym in result.content},
+        listing=True,
+        phrase=kwargs.get("phrase"),
+    )
+
+
+def acronym_key(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Select normalized query parameters of an acronym lookup or listing."""
+    return {
+        "abbreviation": search.normalize(kwargs.get("abbreviation")),
+        "cursor": kwargs.get("cursor"),
+        "fuzzy": kwargs.get("fuzzy"),
+        "id": kwargs.get("id"),
+        "limit": kwargs.get("limit"),
+        "offset": kwargs.get("offset"),
+        "order": kwargs.get("order"),
+        "phrase": search.normalize(kwargs.get("phrase")),
+        "total": kwargs.get("total"),
+    }
+
+
+def acronym_lookup_dependencies(key: Key, value: Any) -> Dependencies:
+    """Find dependencies of an acronym batch lookup entry."""
+    field, term = key
+    if field == "id":
+        return Dependencies(ids={term})
+    return Dependencies(
+        abbreviation=term,
+        ids={acronym["id"] for acronym in value},
+        listing=True,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def backend() -> Backend:
+    """Load cache backend selected in settings once."""
+    settings_ = settings.settings()
+    if settings_.cache == "redis":
+        shared = RedisBackend(redis_client())
+        if settings_.cache_local_size > 0:
+            local = MemoryBackend(
+                settings_.cache_local_size, settings_.cache_memory
+            )
+            return TieredBackend(
+                local, shared, redis_client(), "fastapi-cache:invalidate"
+            )
+        return shared
+    # Registrations are dropped along with their entries, so that the registry
+    # stays within the backend budget.
+    registry_ = registry()
+    return MemoryBackend(
+        settings_.cache_size,
+        settings_.cache_memory,
+        registry_.discard if isinstance(registry_, MemoryRegistry) else None,
+    )
+
+
+def build_key(namespace: str, name: str, parameters: Dict[str, Any]) -> str:
+    """Create cache key that is identical for equivalent route calls."""
+    text = json.dumps(parameters, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{namespace}:{name}:{digest}"
+
+
+def cache(
+    expire: int,
+    namespace: str,
+    dependencies: Callable[[Dict[str, Any], Any], Dependencies],
+    key: Callable[[Dict[str, Any]], Dict[str, Any]],
+    headers: Sequence[str] = (),
+) -> Callable[[Route], Route]:
+    """
+    Cache content responses of routes and register what they depend on.
+
+    The dependencies function receives the route keyword arguments and
+    response. Cache keys are built only from the parameters returned by the key
+    function. Response bodies are cached as rendered, along with the listed
+    response headers, so that hits skip serialization.
+    """
+
+    def decorator(func: Route) -> Route:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            backend = FastAPICache.get_backend()
+            counter = route_counters().setdefault(func.__name__, Counter())
+            key_ = build_key(namespace, func.__name__, key(kwargs))
+            response = kwargs.get("response")
+
+            value = await backend.get(key_)
+            if value is not None:
+                counter.hits += 1
+                # Serialized JSON never contains raw newlines.
+                head, body = decode(value).split("\n", 1)
+                headers_ = orjson.loads(head)
+                if response is not None:
+                    # Entries keep the ETag of the version they were read at,
+                    # so that entries cached before a write never get newer
+                    # ETags.
+                    response.headers.update(headers_)
+                    headers_ = response.headers
+                return Response(
+                    body, headers=headers_, media_type="application/json"
+                )
+
+            counter.misses += 1
+            result = await func(*args, **kwargs)
+            cached_headers = orjson.dumps(
+                {
+                    name: result.headers[name]
+                    for name in [*headers, "ETag"]
+                    if name in result.headers
+                }
+            )
+            # Registering first lets backends drop the registration if they
+            # evict the entry right away.
+            await registry().register(
+                key_, dependencies(kwargs, result), expire
+            )
+            await backend.set(
+                key_,
+                f"{cached_headers.decode()}\n{result.body.decode()}",
+                expire,
+            )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def cache_many(
+    name: str,
+    keys: Iterable[Key],
+    load: Callable[[List[Key]], Awaitable[Dict[Key, Any]]],
+    dependencies: Callable[[Key, Any], Dependencies],
+    expire: int,
+    response: Optional[Response] = None,
+) -> Dict[Key, Any]:
+    """
+    Get values for many keys, loading only uncached keys in one call.
+
+    Keys are field and value pairs. Each key is cached and registered
+    separately, so that overlapping requests share entries. Entries keep the
+    ETag of the response they were loaded for, and the response ETag is
+    lowered to the oldest ETag of its entries.
+    """
+    backend = FastAPICache.get_backend()
+    counter = route_counters().setdefault(name, Counter())
+    etag = None if response is None else response.headers.get("ETag")
+    keys_ = {
+        key: build_key(name, key[0], {"value": key[1]}) for key in set(keys)
+    }
+
+    etags = [] if etag is None else [etag]
+    values = {}
+    for key, key_ in keys_.items():
+        value = await backend.get(key_)
+        if value is not None:
+            head, body = decode(value).split("\n", 1)
+            etags += [tag for tag in [orjson.loads(head).get("ETag")] if tag]
+            values[key] = orjson.loads(body)
+    counter.hits += len(values)
+    if response is not None and etags:
+        response.headers["ETag"] = min(etags, key=etag_version)
+    missing = [key for key in keys_ if key not in values]
+    counter.misses += len(missing)
+    if not missing:
+        return values
+
+    loaded = await load(missing)
+    head = orjson.dumps({} if etag is None else {"ETag": etag}).decode()
+    for key in missing:
+        values[key] = loaded[key]
+        await registry().register(
+            keys_[key], dependencies(key, loaded[key]), expire
+        )
+        await backend.set(
+            keys_[key], f"{head}\n{orjson.dumps(loaded[key]).decode()}", expire
+        )
+    return values
+
+
+def change_buckets(changes: Iterable[Change]) -> Set[str]:
+    """Get index buckets of entries that acronym writes could affect."""
+    buckets = {"all"}
+    for change in changes:
+        buckets.add(f"id:{change.id}")
+        for text in [change.abbreviation.lower(), change.phrase.lower()]:
+            buckets.update(
+                f"gram:{text[start:start + length]}"
+                for length in range(1, GRAM_LENGTH + 1)
+                for start in range(len(text) - length + 1)
+            )
+    return buckets
+
+
+async def clear_keys(backend_: Backend, keys: Sequence[str]) -> None:
+    """Remove cache entries by key with a single call to shared backends."""
+    if isinstance(backend_, RedisBackend):
+        await cast(Redis, backend_.redis).unlink(*keys)
+    elif isinstance(backend_, (MemoryBackend, TieredBackend)):
+        await backend_.clear_keys(keys)
+    else:
+        for key in keys:
+            await backend_.clear(key=key)
+
+
+async def conditional(request: Request, response: Response) -> None:
+    """
+    Answer conditional requests from the data version.
+
+    Responses get an ETag of the current data version. Requests whose
+    If-None-Match header holds that ETag are answered with 304 Not Modified
+    before the route runs. Versions of in process registries only see writes
+    and imports of their own process, so deployments with several replicas
+    need the Redis cache for ETags to follow every write.
+    """
+    etag = f'W/"{await registry().version()}"'
+    headers = {
+        "Cache-Control": "public, max-age="
+        f"{settings.settings().cache_max_age}, must-revalidate",
+        "ETag": etag,
+    }
+
+    tags = request.headers.get("If-None-Match", "")
+    # If-None-Match uses weak comparison, which ignores weakness prefixes.
+    tags_ = {tag.strip().removeprefix("W/") for tag in tags.split(",")}
+    if "*" in tags_ or etag.removeprefix("W/") in tags_:
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+async def close() -> None:
+    """Release cache backend resources."""
+    backend_ = backend()
+    if isinstance(backend_, TieredBackend):
+        await backend_.stop()
+    if settings.settings().cache == "redis":
+        await redis_client().close()
+
+    FastAPICache.reset()
+    backend.cache_clear()
+    redis_client.cache_clear()
+    registry.cache_clear()
+    route_counters.cache_clear()
+
+
+def decode(value: Union[bytes, str]) -> str:
+    """Convert Redis response to text."""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def etag_version(etag: str) -> int:
+    """Get data version of an ETag."""
+    return int(etag.removeprefix("W/").strip('"'))
+
+
+async def initialize() -> None:
+    """Initialize application cache."""
+    backend_ = backend()
+    if isinstance(backend_, TieredBackend):
+        backend_.start()
+    FastAPICache.init(backend_, prefix="fastapi-cache")
+
+
+async def invalidate(changes: Iterable[Change]) -> None:
+    """
+    Evict cache entries affected by acronym writes and bump data version.
+
+    Shared backends evict entries for every application replica. The version is
+    bumped last, so that responses read before the write cannot get its ETag.
+    """
+    keys = await registry().pop_affected(changes)
+    if keys:
+        await clear_keys(FastAPICache.get_backend(), keys)
+    await registry().bump_version()
+
+
+def matches(term: str, value: str) -> bool:
+    """
+    Check whether a search term could match a column value.
+
+    The check errs towards matching, so that it covers every search mode.
+    Terms with LIKE wildcards always match.
+    """
+    term_, value_ = term.lower(), value.lower()
+    if "%" in term_ or "_" in term_:
+        return True
+
+    words = re.findall(r"\w+", term_)
+    if words:
+        return all(word in value_ for word in words)
+    return term_ in value_
+
+
+async def reset() -> None:
+    """
+    Evict every cached response on every replica and bump the data version.
+
+    Meant for writes that bypass the API, such as imports. Memory caches of
+    other processes cannot be reached and only expire.
+    """
+    backend_ = backend()
+    if isinstance(backend_, MemoryBackend):
+        backend_.remove("fastapi-cache", None)
+    else:
+        redis_ = redis_client()
+        version = "fastapi-cache:registry:version"
+        keys = [
+            key
+            async for key in redis_.scan_iter(match="fastapi-cache:*")
+            if decode(key) != version
+        ]
+        for start in range(0, len(keys), 1000):
+            await redis_.unlink(*keys[start : start + 1000])
+        if isinstance(backend_, TieredBackend):
+            backend_.local.remove("fastapi-cache", None)
+            await redis_.publish(
+                backend_.channel,
+                json.dumps({"key": None, "namespace": "fastapi-cache"}),
+            )
+    await registry().bump_version()
+
+
+@functools.lru_cache(maxsize=1)
+def route_counters() -> Dict[str, Counter]:
+    """Get lookup statistics of each cached route by route name."""
+    return {}
+
+
+def statistics() -> Dict[str, Counter]:
+    """Get lookup statistics of each cache tier."""
+    backend_ = backend()
+    if isinstance(backend_, (MemoryBackend, TieredBackend)):
+        return backend_.stats()
+    return {}
+
+
+@functools.lru_cache(maxsize=1)
+def redis_client() -> Redis:
+    """Connect to Redis server from settings once."""
+    return redis.asyncio.from_url(str(settings.settings().redis))
+
+
+@functools.lru_cache(maxsize=1)
+def registry() -> Registry:
+    """Load cache dependency registry once."""
+    if settings.settings().cache == "redis":
+        return RedisRegistry(redis_client(), "fastapi-cache:registry")
+    return MemoryRegistry()
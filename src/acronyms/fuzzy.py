@@ -0,0 +1,160 @@
+"""Typo tolerant abbreviation matching with a symmetric delete index."""
+
+
+import itertools
+from typing import Dict, List, Set, Union
+
+
+class DeleteIndex:
+    """
+    Symmetric delete dictionary of case folded words.
+
+    Every word is stored under each string left after deleting up to the
+    maximum distance of its characters. Words within an edit distance of a
+    term share such a string with it, so lookups only verify the few
+    candidates found under the deletes of the term instead of every word.
+    """
+
+    def __init__(self, distance: int) -> None:
+        """Create index for lookups within at most distance edits."""
+        # Most deletes belong to a single word, which is stored without a set
+        # to save memory.
+        self.deletes: Dict[str, Union[str, Set[str]]] = {}
+        self.distance = distance
+        # Upper bound on word length, which is not lowered on removal.
+        self.longest = 0
+        self.words: Dict[str, Dict[str, int]] = {}
+
+    def add(self, text: str) -> None:
+        """Record text under its case folded word."""
+        word = text.lower()
+        if word not in self.words:
+            self.longest = max(self.longest, len(word))
+            self.words[word] = {}
+            for delete in deletes(word, self.distance):
+                words = self.deletes.setdefault(delete, word)
+                if isinstance(words, set):
+                    words.add(word)
+                elif words != word:
+                    self.deletes[delete] = {words, word}
+        texts = self.words[word]
+        texts[text] = texts.get(text, 0) + 1
+
+    def remove(self, text: str) -> None:
+        """Forget one record of text."""
+        word = text.lower()
+        texts = self.words[word]
+        texts[text] -= 1
+        if texts[text] > 0:
+            return
+
+        del texts[text]
+        if not texts:
+            del self.words[word]
+            for delete in deletes(word, self.distance):
+                words = self.deletes[delete]
+                if isinstance(words, str):
+                    del self.deletes[delete]
+                    continue
+
+                words.discard(word)
+                if len(words) == 1:
+                    self.deletes[delete] = words.pop()
+
+    def search(self, term: str, distance: int) -> List[str]:
+        """
+        Find recorded texts within distance edits of the term.
+
+        Terms longer than every word by more than the distance cannot match,
+        so they return early instead of generating their many deletes.
+        """
+        term_ = term.lower()
+        distance_ = min(distance, self.distance)
+        if len(term_) > self.longest + distance_:
+            return []
+
+        candidates: Set[str] = set()
+        for delete in deletes(term_, distance_):
+            words = self.deletes.get(delete, ())
+            if isinstance(words, str):
+                candidates.add(words)
+            else:
+                candidates.update(words)
+
+        return sorted(
+            text
+            for word in candidates
+            if osa_distance(term_, word, distance_) <= distance_
+            for text in self.words[word]
+        )
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """Get strings left after deleting up to distance characters of word."""
+    return {
+        "".join(
+            character
+            for index, character in enumerate(word)
+            if index not in positions
+        )
+        for count in range(min(distance, len(word)) + 1)
+        for positions in itertools.combinations(range(len(word)), count)
+    }
+
+
+def osa_distance(first: str, second: str, limit: int) -> int:
+    """
+    Compute optimal string alignment distance between two strings.
+
+    Adjacent transpositions count as one edit, so that swapped letters are
+    typos of distance one. Comparison stops with a distance above limit once
+    the limit is certain to be exceeded.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    elif limit == 1:
+        return 0 if first == second else 1 if within_one(first, second) else 2
+
+    previous: List[int] = []
+    current = list(range(len(second) + 1))
+    for row, character in enumerate(first, start=1):
+        before, previous, current = previous, current, [row]
+        for column, other in enumerate(second, start=1):
+            cost = int(character != other)
+            value = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + cost,
+            )
+            if (
+                row > 1
+                and column > 1
+                and character == second[column - 2]
+                and first[row - 2] == other
+            ):
+                value = min(value, before[column - 2] + 1)
+            current.append(value)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def within_one(first: str, second: str) -> bool:
+    """Check in linear time whether distinct strings are one edit apart."""
+    if len(first) > len(second):
+        first, second = second, first
+    index = next(
+        (
+            index
+            for index, (left, right) in enumerate(zip(first, second))
+            if left != right
+        ),
+        len(first),
+    )
+
+    if len(first) < len(second):
+        return first[index:] == second[index + 1 :]
+    return first[index + 1 :] == second[index + 1 :] or (
+        first[index + 2 :] == second[index + 2 :]
+        and first[index : index + 2] == second[index : index + 2][::-1]
+    )
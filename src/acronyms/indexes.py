@@ -0,0 +1,259 @@
+"""In memory search indexes kept in sync with the acronyms table."""
+
+
+import asyncio
+import functools
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import sqlalchemy
+from sqlalchemy import event, orm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from acronyms import cache, models, settings
+from acronyms.fuzzy import DeleteIndex
+from acronyms.models import Acronym
+from acronyms.ranking import WordIndex
+from acronyms.suggest import (
+    KEY_LENGTH,
+    PrefixIndex,
+    abbreviation_keys,
+    phrase_keys,
+)
+
+
+Row = Tuple[int, str, str, Optional[str]]
+Values = Tuple[str, str, Optional[str]]
+
+
+class Indexes:
+    """
+    Prefix, typo and word indexes of acronyms.
+
+    Indexes are built from the acronyms table and then follow committed writes
+    of this process. Writes applied while a rebuild runs are replayed on top
+    of it. The version is the shared data version read before the build, if
+    the cache registry is shared.
+    """
+
+    def __init__(self, distance: Optional[int], words: bool = True) -> None:
+        """
+        Create empty unbuilt indexes for typos up to distance edits.
+
+        Without a distance, no typo index is kept. The word index is only kept
+        if words is set.
+        """
+        self.abbreviations = PrefixIndex()
+        self.built: Optional[float] = None
+        self.distance = distance
+        self.phrases = PrefixIndex()
+        self.replay: Optional[List[Dict[int, Optional[Values]]]] = None
+        self.rows: Dict[int, Values] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.typos = None if distance is None else DeleteIndex(distance)
+        self.version: Optional[int] = None
+        self.words = WordIndex() if words else None
+
+    def apply(self, rows: Dict[int, Optional[Values]]) -> None:
+        """Update indexes with current values of acronyms, None if removed."""
+        if self.replay is not None:
+            self.replay.append(rows)
+        if self.built is None:
+            return
+
+        for id_, values in rows.items():
+            previous = self.rows.pop(id_, None)
+            if previous is not None:
+                abbreviation, phrase, description = previous
+                self.abbreviations.remove(
+                    abbreviation_keys(abbreviation), abbreviation
+                )
+                self.phrases.remove(phrase_keys(phrase), phrase)
+                if self.typos is not None:
+                    self.typos.remove(abbreviation)
+                if self.words is not None:
+                    self.words.remove(id_, text(phrase, description))
+            if values is not None:
+                abbreviation, phrase, description = values
+                self.rows[id_] = values
+                self.abbreviations.add(
+                    abbreviation_keys(abbreviation), abbreviation
+                )
+                self.phrases.add(phrase_keys(phrase), phrase)
+                if self.typos is not None:
+                    self.typos.add(abbreviation)
+                if self.words is not None:
+                    self.words.add(id_, abbreviation, text(phrase, description))
+
+    def rank(self, query: str, limit: int) -> List[int]:
+        """Get identifiers of the acronyms best matching a query in order."""
+        query_ = query.strip().lower()
+        if self.words is None or not query_:
+            return []
+        completions = self.abbreviations.complete(query_[:KEY_LENGTH], limit)
+        return self.words.search(query_, limit, completions)
+
+    def replace(self, built: "Indexes") -> None:
+        """Take over indexes of a rebuild and replay writes made meanwhile."""
+        self.abbreviations, self.phrases = built.abbreviations, built.phrases
+        self.rows, self.typos = built.rows, built.typos
+        self.words = built.words
+        self.built = time.monotonic()
+        replay, self.replay = self.replay or [], None
+        for rows in replay:
+            self.apply(rows)
+
+    def suggest(self, prefix: str, limit: int) -> Dict[str, List[str]]:
+        """Get completions of a prefix for each column."""
+        key = prefix.strip().lower()[:KEY_LENGTH]
+        return {
+            "abbreviations": self.abbreviations.complete(key, limit),
+            "phrases": self.phrases.complete(key, limit),
+        }
+
+
+def build(
+    rows: Sequence[Row], distance: Optional[int], words: bool = True
+) -> Indexes:
+    """Create indexes of acronyms with one sort per prefix index."""
+    indexes_ = Indexes(distance, words)
+    abbreviations: List[Tuple[str, str]] = []
+    phrases: List[Tuple[str, str]] = []
+    for id_, abbreviation, phrase, description in rows:
+        indexes_.rows[id_] = (abbreviation, phrase, description)
+        abbreviations.extend(
+            (key, abbreviation) for key in abbreviation_keys(abbreviation)
+        )
+        phrases.extend((key, phrase) for key in phrase_keys(phrase))
+        if indexes_.typos is not None:
+            indexes_.typos.add(abbreviation)
+
+    abbreviations.sort()
+    phrases.sort()
+    indexes_.abbreviations = PrefixIndex(abbreviations)
+    indexes_.phrases = PrefixIndex(phrases)
+    if words:
+        indexes_.words = WordIndex(
+            (row[0], row[1], text(row[2], row[3])) for row in rows
+        )
+    return indexes_
+
+
+@event.listens_for(orm.Session, "after_commit")
+def apply_staged(session: orm.Session) -> None:
+    """Apply index updates of a committed transaction."""
+    staged = session.info.pop("indexes", None)
+    if staged:
+        indexes().apply(staged)
+
+
+async def close() -> None:
+    """Stop background rebuild and drop indexes."""
+    task = indexes().task
+    if task is not None:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    indexes.cache_clear()
+
+
+def current() -> Indexes:
+    """
+    Get indexes for a lookup.
+
+    Indexes older than the refresh interval are refreshed in the background to
+    pick up writes of other processes, while the current ones keep serving.
+    """
+    indexes_ = indexes()
+    interval = settings.settings().search_refresh
+    if (
+        interval > 0
+        and indexes_.built is not None
+        and time.monotonic() - indexes_.built > interval
+        and (indexes_.task is None or indexes_.task.done())
+    ):
+        indexes_.task = asyncio.create_task(refresh())
+    return indexes_
+
+
+async def data_version() -> Optional[int]:
+    """Get data version if it covers writes of every process."""
+    registry = cache.registry()
+    return await registry.version() if registry.shared else None
+
+
+@event.listens_for(orm.Session, "after_rollback")
+def discard_staged(session: orm.Session) -> None:
+    """Drop index updates of a rolled back transaction."""
+    session.info.pop("indexes", None)
+
+
+@functools.lru_cache(maxsize=1)
+def indexes() -> Indexes:
+    """Load search indexes once."""
+    settings_ = settings.settings()
+    return Indexes(
+        settings_.search_distance if settings_.search_typo_index else None,
+        settings_.search_word_index,
+    )
+
+
+async def initialize() -> None:
+    """
+    Build search indexes from the acronyms table.
+
+    Acronyms are read on the read engine, so that a rebuild of a large table
+    does not hold the writer connection of tuned SQLite databases. Indexes are
+    built in a worker thread, so that the rebuild does not stall requests.
+    """
+    indexes_ = indexes()
+    indexes_.replay = []
+    try:
+        version = await data_version()
+        async with AsyncSession(models.get_read_engine()) as session:
+            result = await session.execute(
+                sqlalchemy.select(
+                    Acronym.id,
+                    Acronym.abbreviation,
+                    Acronym.phrase,
+                    Acronym.description,
+                )
+            )
+            rows = [(row[0], row[1], row[2], row[3]) for row in result]
+        built = await asyncio.to_thread(
+            build, rows, indexes_.distance, indexes_.words is not None
+        )
+    except BaseException:
+        indexes_.replay = None
+        raise
+    indexes_.replace(built)
+    indexes_.version = version
+
+
+async def refresh() -> None:
+    """
+    Rebuild search indexes if acronyms changed since they were built.
+
+    Writes of this process are already applied. Without a shared data version,
+    writes of other processes cannot be detected, so indexes are always
+    rebuilt.
+    """
+    indexes_ = indexes()
+    version = await data_version()
+    if version is not None and version == indexes_.version:
+        indexes_.built = time.monotonic()
+        return
+    await initialize()
+
+
+def stage(
+    session: AsyncSession, ids: Iterable[int], rows: Iterable[Any]
+) -> None:
+    """Queue index updates of acronyms until the session commits."""
+    staged = session.info.setdefault("indexes", {})
+    staged.update({id_: None for id_ in ids})
+    staged.update({row[0]: (row[1], row[2], row[3]) for row in rows})
+
+
+def text(phrase: str, description: Optional[str]) -> str:
+    """Join searchable text of an acronym."""
+    return phrase if description is None else f"{phrase} {description}"
@@ -0,0 +1,169 @@
+"""Bulk import of acronym files into the database."""
+
+
+import csv
+import itertools
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    TextIO,
+)
+
+import sqlalchemy
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from acronyms import cache, models
+from acronyms.models import Acronym
+from acronyms.schemas import AcronymBody
+
+
+FileFormat = Literal["csv", "json", "ndjson"]
+COLUMNS = ("abbreviation", "description", "phrase")
+FORMATS: Dict[str, FileFormat] = {
+    ".csv": "csv",
+    ".json": "json",
+    ".jsonl": "ndjson",
+    ".ndjson": "ndjson",
+}
+logger = logging.getLogger(__name__)
+
+
+def chunks(
+    rows: Iterable[Dict[str, Any]], size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Group rows into lists of at most size rows."""
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def copy(connection: AsyncConnection, chunk: List[Dict[str, Any]]) -> int:
+    """
+    Insert rows on PostgreSQL with COPY and return number of new rows.
+
+    COPY cannot skip rows that violate constraints, so rows are copied into a
+    temporary table and moved from there without duplicates.
+    """
+    await connection.execute(
+        sqlalchemy.text(
+            "CREATE TEMPORARY TABLE IF NOT EXISTS acronyms_import "
+            "(abbreviation TEXT, description TEXT, phrase TEXT) "
+            "ON COMMIT DELETE ROWS"
+        )
+    )
+    raw = await connection.get_raw_connection()
+    driver: Any = raw.driver_connection
+    await driver.copy_records_to_table(
+        "acronyms_import",
+        columns=COLUMNS,
+        records=[tuple(row[column] for column in COLUMNS) for row in chunk],
+    )
+    result = await connection.execute(
+        sqlalchemy.text(
+            "INSERT INTO acronyms (abbreviation, description, phrase) "
+            "SELECT DISTINCT ON (abbreviation, phrase) "
+            "abbreviation, description, phrase FROM acronyms_import "
+            "ON CONFLICT (abbreviation, phrase) DO NOTHING"
+        )
+    )
+    return result.rowcount
+
+
+async def insert(
+    connection: AsyncConnection, chunk: List[Dict[str, Any]]
+) -> int:
+    """Insert rows with executemany and return number of new rows."""
+    statement = sqlite.insert(Acronym).on_conflict_do_nothing(
+        index_elements=["abbreviation", "phrase"]
+    )
+    result = await connection.execute(statement, chunk)
+    return result.rowcount
+
+
+async def load(
+    path: Path,
+    file_format: Optional[FileFormat] = None,
+    chunk_size: int = 10000,
+    output: TextIO = sys.stderr,
+) -> int:
+    """
+    Stream acronyms from a file into the database in chunked transactions.
+
+    Rows whose abbreviation and phrase already exist are skipped. Progress is
+    written to output after every chunk. SQLite search tables are kept in sync
+    by triggers. Cached responses are evicted and the data version bumped once
+    new acronyms are committed. Returns the number of new acronyms.
+    """
+    if file_format is None:
+        file_format = FORMATS.get(path.suffix.lower(), "ndjson")
+    engine = models.get_engine()
+    start = time.perf_counter()
+    inserted, total = 0, 0
+
+    try:
+        try:
+            with path.open(newline="", encoding="utf-8") as file:
+                for chunk in chunks(read(file, file_format), chunk_size):
+                    async with engine.begin() as connection:
+                        if connection.dialect.name == "postgresql":
+                            inserted += await copy(connection, chunk)
+                        else:
+                            inserted += await insert(connection, chunk)
+
+                    total += len(chunk)
+                    rate = total / max(time.perf_counter() - start, 1e-9)
+                    print(
+                        f"Imported {inserted} new of {total} read acronyms "
+                        f"({rate:.0f} rows/s)",
+                        file=output,
+                    )
+        except BaseException:
+            # Earlier chunks stay committed when a later chunk fails
+            # validation, but the import error must not be replaced.
+            if inserted > 0:
+                try:
+                    await cache.reset()
+                except Exception:
+                    logger.exception("Cache reset after failed import failed")
+            raise
+
+        if inserted > 0:
+            await cache.reset()
+    finally:
+        await engine.dispose()
+    return inserted
+
+
+def read(file: TextIO, file_format: FileFormat) -> Iterator[Dict[str, Any]]:
+    """
+    Parse and validate acronyms from a file.
+
+    CSV and NDJSON files are read one row at a time. JSON files must hold an
+    array of acronyms and are parsed whole. Empty CSV fields are missing
+    values.
+    """
+    rows: Iterable[Dict[str, Any]]
+    if file_format == "csv":
+        rows = (
+            {key: value or None for key, value in row.items()}
+            for row in csv.DictReader(file)
+        )
+    elif file_format == "json":
+        rows = json.load(file)
+    else:
+        rows = (json.loads(line) for line in file if line.strip())
+
+    for row in rows:
+        acronym = AcronymBody.model_validate(row)
+        yield acronym.model_dump(include=set(COLUMNS))
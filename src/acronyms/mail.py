@@ -1,11 +1,219 @@
 """Application email logic."""
 
 
+import asyncio
+import contextlib
+import email
+from email.message import EmailMessage
+from email.policy import default
 import functools
+import logging
+import time
+from typing import List, Optional, Tuple, cast
 
+import aiosmtplib
 from redmail import EmailSender
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from acronyms import settings
+from acronyms import models, settings
+from acronyms.models import MailMessage
+
+
+Job = Tuple[EmailMessage, Optional[int]]
+logger = logging.getLogger(__name__)
+
+
+class Dispatcher:
+    """
+    Background queue that delivers email over reused SMTP connections.
+
+    Each worker keeps its connection open between messages, so that bursts of
+    email are sent without a handshake per message. Transient failures are
+    retried with exponential backoff. In outbox mode, messages are stored in
+    the database until delivered and messages left over from previous runs are
+    queued again on start. Outbox messages are claimed by one dispatcher at a
+    time, so that replicas starting together do not send them twice.
+    """
+
+    def __init__(
+        self, concurrency: int, retries: int, backoff: float, outbox: bool
+    ) -> None:
+        """Create dispatcher with at most concurrency SMTP connections."""
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.outbox = outbox
+        self.queue: asyncio.Queue[Job] = asyncio.Queue()
+        self.retries = retries
+        self.workers: List[asyncio.Task] = []
+
+    async def deliver(
+        self, smtp: aiosmtplib.SMTP, message: EmailMessage
+    ) -> bool:
+        """
+        Send message, reconnecting and retrying after transient failures.
+
+        Returns whether the message is settled, which is the case after
+        delivery or after a permanent rejection by the server.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                if not smtp.is_connected:
+                    await smtp.connect()
+                await smtp.send_message(message)
+                return True
+            except aiosmtplib.SMTPResponseException as exception:
+                if exception.code >= 500:
+                    logger.error("Email rejected: %s", exception)
+                    return True
+                error: Exception = exception
+            except (aiosmtplib.SMTPException, OSError) as exception:
+                error = exception
+
+            smtp.close()
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2**attempt)
+        logger.error("Email delivery failed: %s", error)
+        return False
+
+    async def send(self, message: EmailMessage) -> None:
+        """Queue message for delivery."""
+        id_ = await store(message) if self.outbox else None
+        self.queue.put_nowait((message, id_))
+
+    async def start(self) -> None:
+        """Queue unclaimed messages of the outbox and start workers."""
+        if self.outbox:
+            for job in await pending():
+                self.queue.put_nowait(job)
+        self.workers = [
+            asyncio.create_task(self.work()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Wait for queued messages up to timeout and stop workers."""
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.queue.join(), timeout)
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def work(self) -> None:
+        """
+        Deliver queued messages over one SMTP connection.
+
+        Settled messages are removed from the outbox, while claims of failed
+        messages are released for the next start. Unexpected errors are logged,
+        so that the worker keeps serving the queue.
+        """
+        smtp = client()
+        try:
+            while True:
+                message, id_ = await self.queue.get()
+                try:
+                    settled = await self.deliver(smtp, message)
+                    if id_ is not None:
+                        await (remove(id_) if settled else release(id_))
+                except Exception:
+                    logger.exception("Email dispatch failed")
+                finally:
+                    self.queue.task_done()
+        finally:
+            if smtp.is_connected:
+                with contextlib.suppress(aiosmtplib.SMTPException, OSError):
+                    await smtp.quit()
+            smtp.close()
+
+
+def client() -> aiosmtplib.SMTP:
+    """Create unconnected SMTP client from settings."""
+    settings_ = settings.settings()
+    return aiosmtplib.SMTP(
+        hostname=settings_.smtp_host,
+        password=settings_.smtp_password.get_secret_value() or None,
+        port=settings_.smtp_port,
+        start_tls=settings_.smtp_tls,
+        username=settings_.smtp_username or None,
+    )
+
+
+async def close() -> None:
+    """Stop email dispatcher after sending queued messages."""
+    await dispatcher().stop()
+    dispatcher.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def dispatcher() -> Dispatcher:
+    """Load email dispatcher once."""
+    settings_ = settings.settings()
+    return Dispatcher(
+        concurrency=settings_.smtp_concurrency,
+        retries=settings_.smtp_retries,
+        backoff=settings_.smtp_backoff,
+        outbox=settings_.smtp_outbox,
+    )
+
+
+async def initialize() -> None:
+    """Start email dispatcher."""
+    await dispatcher().start()
+
+
+async def pending() -> List[Job]:
+    """
+    Claim undelivered messages of the outbox that no dispatcher is sending.
+
+    Claims expire after the claim timeout, so that messages of dispatchers
+    which stopped while sending are sent again.
+    """
+    now = time.time()
+    expired = now - settings.settings().smtp_claim_timeout
+    async with AsyncSession(models.get_engine()) as session:
+        result = await session.execute(
+            sqlalchemy.update(MailMessage)
+            .where(
+                sqlalchemy.or_(
+                    MailMessage.claimed_at.is_(None),
+                    MailMessage.claimed_at < expired,
+                )
+            )
+            .values(claimed_at=now)
+            .returning(MailMessage.id, MailMessage.message)
+        )
+        rows = sorted(result.all())
+        await session.commit()
+    return [
+        (
+            cast(
+                EmailMessage,
+                email.message_from_string(message, policy=default),
+            ),
+            id_,
+        )
+        for id_, message in rows
+    ]
+
+
+async def release(id_: int) -> None:
+    """Remove claim of an undelivered message from the outbox."""
+    async with AsyncSession(models.get_engine()) as session:
+        await session.execute(
+            sqlalchemy.update(MailMessage)
+            .where(MailMessage.id == id_)
+            .values(claimed_at=None)
+        )
+        await session.commit()
+
+
+async def remove(id_: int) -> None:
+    """Delete settled message from the outbox."""
+    async with AsyncSession(models.get_engine()) as session:
+        await session.execute(
+            sqlalchemy.delete(MailMessage).where(MailMessage.id == id_)
+        )
+        await session.commit()
 
 
 @functools.lru_cache(maxsize=1)
@@ -19,3 +227,15 @@ def sender() -> EmailSender:
         use_starttls=settings_.smtp_tls,
         username=settings_.smtp_username,
     )
+
+
+async def store(message: EmailMessage) -> int:
+    """Save message to the outbox, claimed for sending, and return its id."""
+    async with AsyncSession(models.get_engine()) as session:
+        id_ = await session.scalar(
+            sqlalchemy.insert(MailMessage)
+            .values(claimed_at=time.time(), message=message.as_string())
+            .returning(MailMessage.id)
+        )
+        await session.commit()
+    return cast(int, id_)
@@ -3,22 +3,21 @@
 
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
 
-from acronyms import auth, models
-from acronyms.routes import acronyms
+from acronyms import auth, cache, indexes, mail, models, search
+from acronyms.routes import acronyms, stats
 
 
 package = Path(__file__).parent
-app = FastAPI(redoc_url=None)
+app = FastAPI(dependencies=[Depends(models.remember_write)], redoc_url=None)
 app.mount(
     "/assets", StaticFiles(directory=package / "web/assets"), name="assets"
 )
 app.include_router(acronyms.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
 auth.include_routes(app)
 
 
@@ -37,5 +36,17 @@ def read_favicon() -> FileResponse:
 @app.on_event("startup")
 async def startup() -> None:
     """Initialize configuration for web application."""
-    FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+    await cache.initialize()
     await models.initialize_database()
+    await search.initialize_index()
+    await indexes.initialize()
+    await mail.initialize()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    """Release resources of web application."""
+    await mail.close()
+    await indexes.close()
+    await cache.close()
+    await models.close()
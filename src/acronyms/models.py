@@ -2,32 +2,94 @@
 
 
 import functools
-from typing import AsyncIterator, Literal
+import itertools
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    cast,
+)
+import uuid
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
 from fastapi_users_db_sqlalchemy.access_token import (
     SQLAlchemyAccessTokenDatabase,
     SQLAlchemyBaseAccessTokenTableUUID,
 )
 from sqlalchemy import (
+    DDL,
     CheckConstraint,
     Column,
+    Float,
+    Index,
     Integer,
     Unicode,
     UniqueConstraint,
+    event,
     orm,
 )
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext import asyncio
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import UpdateBase
 
 from acronyms import settings
 
 
 AcronymColumn = Literal["id", "abbreviation", "description", "phrase"]
+PRIMARY_COOKIE = "acronyms_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "cache_size": -64000,
+    "mmap_size": 2**28,
+    "synchronous": "NORMAL",
+}
 registry: orm.registry = orm.registry()
 
 
+class RoutingSession(orm.Session):
+    """
+    Session that sends reads to a read engine until its transaction writes.
+
+    Once a transaction writes, every statement goes to the primary engine so
+    that the transaction reads its own writes.
+    """
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        clause: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Select engine for a statement."""
+        reader = self.info.get("reader")
+        writing = (
+            self.info.get("writing", False)
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+        )
+        if reader is None or writing:
+            self.info["writing"] = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return reader
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def end_writing(
+    session: orm.Session, transaction: orm.SessionTransaction
+) -> None:
+    """Send reads of the next transaction to the read engine again."""
+    if transaction.parent is None:
+        session.info["writing"] = False
+
+
 @registry.mapped
 class AccessToken(SQLAlchemyBaseAccessTokenTableUUID):
     """Access token for bearer authentication."""
@@ -40,7 +102,23 @@ class Acronym:
     """SQL model for acronyms table."""
 
     __tablename__ = "acronyms"
-    __table_args__ = (UniqueConstraint("abbreviation", "phrase"),)
+    __table_args__ = (
+        UniqueConstraint("abbreviation", "phrase"),
+        # Trigram GIN indexes let PostgreSQL answer LIKE '%term%' filters
+        # without a sequential scan.
+        Index(
+            "ix_acronyms_abbreviation_trigram",
+            "abbreviation",
+            postgresql_ops={"abbreviation": "gin_trgm_ops"},
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_acronyms_phrase_trigram",
+            "phrase",
+            postgresql_ops={"phrase": "gin_trgm_ops"},
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)  # noqa: A003
     abbreviation = Column(
@@ -58,6 +136,22 @@ class Acronym:
     )
 
 
+@registry.mapped
+class MailMessage:
+    """
+    SQL model for the outbox of undelivered email.
+
+    Messages are claimed by the dispatcher sending them, with the claim time
+    in seconds since the epoch.
+    """
+
+    __tablename__ = "mail_outbox"
+
+    id = Column(Integer, primary_key=True)  # noqa: A003
+    claimed_at = Column(Float, nullable=True)
+    message = Column(Unicode, nullable=False)
+
+
 @registry.mapped
 class User(SQLAlchemyBaseUserTableUUID):
     """User database format."""
@@ -65,23 +159,173 @@ class User(SQLAlchemyBaseUserTableUUID):
     pass
 
 
+event.listen(
+    Acronym.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+async def close() -> None:
+    """Release database connections."""
+    read_engine = get_read_engine()
+    if read_engine is not get_engine():
+        await read_engine.dispose()
+    for replica in get_replica_engines():
+        await replica.dispose()
+    await get_engine().dispose()
+
+    get_engine.cache_clear()
+    get_read_engine.cache_clear()
+    get_replica_engines.cache_clear()
+    replica_rotation.cache_clear()
+
+
+def connect_arguments(uri: str) -> Dict[str, Any]:
+    """Get driver connection arguments for a database."""
+    settings_ = settings.settings()
+    if uri.startswith("sqlite"):
+        return {"check_same_thread": False}
+    elif settings_.database_pgbouncer:
+        # PgBouncer in transaction mode can hand each statement to a different
+        # server connection, so named prepared statements must be unique and
+        # never reused.
+        return {
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": statement_name,
+            "statement_cache_size": 0,
+        }
+
+    size = settings_.database_statement_cache_size
+    return {
+        "prepared_statement_cache_size": size,
+        "statement_cache_size": size,
+    }
+
+
+def create_engine(
+    uri: str, pool_size: Optional[int] = None, max_overflow: int = 0
+) -> AsyncEngine:
+    """
+    Create engine with a connection pool.
+
+    Server databases get a pool of the configured size. SQLite databases keep
+    the dialect default pool unless a size is given, since in memory databases
+    must share a single connection.
+    """
+    settings_ = settings.settings()
+    pool: Dict[str, Any] = {}
+    if pool_size is None and not uri.startswith("sqlite"):
+        pool_size = settings_.database_pool_size
+        max_overflow = settings_.database_max_overflow
+    if pool_size is not None:
+        pool = {
+            "max_overflow": max_overflow,
+            "pool_size": pool_size,
+            "pool_timeout": settings_.database_pool_timeout,
+            "poolclass": AsyncAdaptedQueuePool,
+        }
+
+    return asyncio.create_async_engine(
+        uri,
+        connect_args=connect_arguments(uri),
+        future=True,
+        pool_pre_ping=settings_.database_pool_pre_ping,
+        pool_recycle=settings_.database_pool_recycle,
+        **pool,
+    )
+
+
 @functools.lru_cache(maxsize=1)
 def get_engine() -> AsyncEngine:
-    """Create engine for database connection."""
-    uri = settings.settings().database
-    if "sqlite" in uri.scheme:
-        return asyncio.create_async_engine(
-            str(uri), connect_args={"check_same_thread": False}, future=True
-        )
+    """
+    Create engine for database connection.
+
+    Tuned SQLite databases get a single connection, so that writers queue in
+    the pool instead of failing on the database lock.
+    """
+    settings_ = settings.settings()
+    uri = str(settings_.database)
+    if not tuned_sqlite():
+        return create_engine(uri)
+
+    engine = create_engine(uri, 1, 0)
+    event.listen(engine.sync_engine, "connect", set_write_pragmas)
+    return engine
+
+
+@functools.lru_cache(maxsize=1)
+def get_read_engine() -> AsyncEngine:
+    """
+    Create engine for read only database connections.
+
+    Only tuned SQLite databases have separate read connections, which WAL
+    journaling lets run alongside the writer.
+    """
+    if not tuned_sqlite():
+        return get_engine()
+
+    # Other query parameters of the database URL are kept, which with URI
+    # filenames SQLite reads as options of the database file.
+    url = make_url(str(settings.settings().database))
+    database = cast(str, url.database)
+    if not database.startswith("file:"):
+        database = f"file:{database}"
+    engine = create_engine(
+        url.set(
+            database=database, query={**url.query, "mode": "ro", "uri": "true"}
+        ).render_as_string(hide_password=False)
+    )
+    event.listen(engine.sync_engine, "connect", set_pragmas)
+    return engine
+
+
+def create_session() -> AsyncSession:
+    """Create session on the primary database."""
+    # Argument expire_on_commit=False prevents Greenlet environment from
+    # expiring after first request.
+    return AsyncSession(
+        get_engine(),
+        expire_on_commit=False,
+        info={"reader": get_read_engine().sync_engine},
+        sync_session_class=RoutingSession,
+    )
+
+
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """
+    Create database session for a read only route.
+
+    Reads are spread across replicas in turn. Unsafe requests and clients that
+    wrote within the replica lag use the primary database instead, so that
+    clients read their own writes.
+    """
+    if (
+        get_replica_engines()
+        and request.method in SAFE_METHODS
+        and PRIMARY_COOKIE not in request.cookies
+    ):
+        engine = next(replica_rotation())
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
     else:
-        return asyncio.create_async_engine(str(uri), future=True)
+        async with create_session() as session:
+            yield session
+
+
+@functools.lru_cache(maxsize=1)
+def get_replica_engines() -> List[AsyncEngine]:
+    """Create engines for read replica databases."""
+    return [
+        create_engine(str(uri)) for uri in settings.settings().database_replicas
+    ]
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     """Create database session."""
-    # Argument expire_on_commit=False prevents Greenlet environment from
-    # expiring after first request.
-    async with AsyncSession(get_engine(), expire_on_commit=False) as session:
+    async with create_session() as session:
         # Teardown logic is executed after HTTP response is completed for
         # "yield" statements in FastAPI,
         # https://fastapi.tiangolo.com/tutorial/dependencies/dependencies-with-yield/.
@@ -96,12 +340,62 @@ async def get_tokens(
 
 
 async def get_users(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> AsyncIterator[SQLAlchemyUserDatabase]:
-    """Get login users database table."""
+    """Get login users database table, read from replicas for safe requests."""
     yield SQLAlchemyUserDatabase(session, User)
 
 
+def remember_write(request: Request, response: Response) -> None:
+    """Pin client to the primary database for the replica lag after writes."""
+    if get_replica_engines() and request.method not in SAFE_METHODS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            httponly=True,
+            max_age=settings.settings().database_replica_lag,
+            samesite="lax",
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def replica_rotation() -> Iterator[AsyncEngine]:
+    """Cycle through read replica engines."""
+    return itertools.cycle(get_replica_engines())
+
+
+def set_pragmas(connection: Any, _: Any) -> None:
+    """Apply SQLite performance pragmas to a new connection."""
+    cursor = connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+def set_write_pragmas(connection: Any, record: Any) -> None:
+    """Apply SQLite performance pragmas and WAL journaling to a connection."""
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.close()
+    set_pragmas(connection, record)
+
+
+def statement_name() -> str:
+    """Create unique name for an asyncpg prepared statement."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def tuned_sqlite() -> bool:
+    """Check whether database is a SQLite file with performance tuning."""
+    settings_ = settings.settings()
+    database = settings_.database
+    return (
+        "sqlite" in database.scheme
+        and settings_.database_sqlite_tuning
+        and database.path not in (None, "/", "/:memory:")
+    )
+
+
 async def initialize_database() -> None:
     """Initialize database."""
     async with get_engine().begin() as connection:
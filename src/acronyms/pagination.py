@@ -0,0 +1,162 @@
+"""Keyset pagination and total counts for acronym listings."""
+
+
+import base64
+import binascii
+import json
+from typing import (
+    Any,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import sqlalchemy
+from sqlalchemy import ColumnElement, Row, ScalarSelect, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from acronyms import settings
+from acronyms.models import Acronym, AcronymColumn
+
+
+CountMode = Literal["exact", "approximate"]
+Key = Union[int, str]
+
+
+def after(order: Optional[AcronymColumn], cursor: str) -> ColumnElement[bool]:
+    """
+    Build filter for acronyms that sort after the cursor position.
+
+    Cursors are only valid for the order of the listing that created them.
+    """
+    order_, value, id_ = decode(cursor)
+    if order_ != (order or "id"):
+        raise ValueError("Pagination cursor belongs to another order")
+    if order is None or order == "id":
+        return Acronym.id > id_
+    return sqlalchemy.tuple_(sort_key(order), Acronym.id) > sqlalchemy.tuple_(
+        sqlalchemy.literal(value), sqlalchemy.literal(id_)
+    )
+
+
+def count(query: Select, mode: CountMode) -> ScalarSelect[int]:
+    """
+    Build scalar subquery counting rows of a filtered acronym query.
+
+    Approximate counts stop after the configured count limit plus one row, so
+    that a result above the limit can be reported without counting the rest.
+    """
+    if mode == "approximate":
+        capped = query.with_only_columns(Acronym.id).limit(
+            settings.settings().count_limit + 1
+        )
+        return (
+            sqlalchemy.select(sqlalchemy.func.count())
+            .select_from(capped.subquery())
+            .scalar_subquery()
+        )
+    return query.with_only_columns(
+        sqlalchemy.func.count(Acronym.id)
+    ).scalar_subquery()
+
+
+def count_headers(total: int, mode: CountMode) -> Tuple[str, str]:
+    """Format total count and count mode response header values."""
+    limit = settings.settings().count_limit
+    if mode == "approximate" and total > limit:
+        return f"{limit}+", "capped"
+    return str(total), "exact"
+
+
+def decode(cursor: str) -> Tuple[str, Key, int]:
+    """Parse cursor into its sort order, sort key value and acronym id."""
+    try:
+        text = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        order, value, id_ = json.loads(text)
+    except (binascii.Error, TypeError, UnicodeError, ValueError) as exception:
+        raise ValueError("Invalid pagination cursor") from exception
+
+    if (
+        not isinstance(order, str)
+        or not isinstance(value, int if order == "id" else str)
+        or not isinstance(id_, int)
+    ):
+        raise ValueError("Invalid pagination cursor")
+    return order, value, id_
+
+
+def encode(order: Optional[AcronymColumn], acronym: Row) -> str:
+    """Create opaque cursor pointing after an acronym row in an order."""
+    if order is None or order == "id":
+        value: Key = acronym.id
+    else:
+        # Mirrors sort_key, which orders missing descriptions as empty text.
+        value = getattr(acronym, order) or ""
+    text = json.dumps([order or "id", value, acronym.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii")
+
+
+async def estimate(session: AsyncSession, query: Select) -> Optional[int]:
+    """
+    Estimate number of rows of a filtered query from the query planner.
+
+    Returns None for databases without planner row estimates.
+    """
+    dialect = session.get_bind().dialect
+    if dialect.name != "postgresql":
+        return None
+
+    compiled = query.compile(
+        dialect=dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(
+        sqlalchemy.text(f"EXPLAIN (FORMAT JSON) {compiled}")
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def ordering(order: Optional[AcronymColumn]) -> List[Any]:
+    """Get deterministic sort columns with acronym id as tie breaker."""
+    if order is None or order == "id":
+        return [Acronym.id]
+    return [sort_key(order), Acronym.id]
+
+
+async def page_total(
+    session: AsyncSession,
+    query: Select,
+    rows: Sequence[Row],
+    mode: CountMode,
+    start: bool,
+) -> int:
+    """
+    Get total count carried by page rows.
+
+    Only empty pages past the start of the listing need a separate count
+    query.
+    """
+    if rows:
+        return cast(int, rows[0][-1])
+    elif start:
+        return 0
+    total = await session.scalar(sqlalchemy.select(count(query, mode)))
+    return cast(int, total)
+
+
+def sort_key(order: AcronymColumn) -> ColumnElement:
+    """
+    Get sort expression for a column.
+
+    Descriptions are nullable, so they are compared as empty text to keep
+    cursor comparisons total across databases.
+    """
+    if order == "description":
+        return sqlalchemy.func.coalesce(Acronym.description, "")
+    return cast(ColumnElement, getattr(Acronym, order))
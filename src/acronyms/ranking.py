@@ -0,0 +1,365 @@
+"""Relevance ranking of acronyms with an inverted word index."""
+
+
+from array import array
+import bisect
+import heapq
+import math
+import re
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+# Additive boosts put abbreviation hits ahead of most phrase matches.
+EXACT_BOOST = 20.0
+PREFIX_BOOST = 10.0
+# BM25 term frequency saturation and document length normalization.
+K1 = 1.2
+B = 0.75
+
+
+class Postings:
+    """
+    Acronyms containing a word, grouped by word frequency.
+
+    Each group keeps lengths and identifiers of its acronyms in parallel
+    arrays ordered by both, which saves memory. Within a group, shorter
+    acronyms score higher, so merging groups by score visits acronyms best
+    first. Frequencies above one are rare in short texts, so only they are
+    stored per acronym.
+    """
+
+    def __init__(self, entries: Sequence[Tuple[int, int, int]] = ()) -> None:
+        """Create postings from frequency, length and identifier triples."""
+        self.groups: Dict[int, Tuple[array, array]] = {}
+        self.repeats: Dict[int, int] = {}
+        self.size = len(entries)
+        for frequency, length, id_ in sorted(entries):
+            lengths, ids = self.groups.setdefault(
+                frequency, (array("q"), array("q"))
+            )
+            lengths.append(length)
+            ids.append(id_)
+            if frequency > 1:
+                self.repeats[id_] = frequency
+
+    def add(self, id_: int, length: int, frequency: int) -> None:
+        """Record acronym with the number of times it contains the word."""
+        lengths, ids = self.groups.setdefault(
+            frequency, (array("q"), array("q"))
+        )
+        index = find(lengths, ids, id_, length)
+        lengths.insert(index, length)
+        ids.insert(index, id_)
+        if frequency > 1:
+            self.repeats[id_] = frequency
+        self.size += 1
+
+    def contains(self, id_: int, length: int) -> bool:
+        """Check whether acronym contains the word."""
+        group = self.groups.get(self.frequency(id_))
+        if group is None:
+            return False
+        lengths, ids = group
+        index = find(lengths, ids, id_, length)
+        return index < len(ids) and ids[index] == id_
+
+    def frequency(self, id_: int) -> int:
+        """Get number of times the acronym contains the word."""
+        return self.repeats.get(id_, 1)
+
+    def merge(
+        self, weight: float, average: float
+    ) -> Iterator[Tuple[int, int, float, int]]:
+        """
+        Iterate over acronyms best first.
+
+        Each acronym comes with its length, its score for the word and the
+        shortest length among it and the acronyms yet to come.
+        """
+        heads = [
+            (-weight * saturate(frequency, lengths[0], average), frequency, 0)
+            for frequency, (lengths, _) in self.groups.items()
+        ]
+        heapq.heapify(heads)
+        while heads:
+            impact, frequency, index = heads[0]
+            lengths, ids = self.groups[frequency]
+            shortest = min(self.groups[head[1]][0][head[2]] for head in heads)
+            yield ids[index], lengths[index], -impact, shortest
+
+            if index + 1 < len(ids):
+                impact = -weight * saturate(
+                    frequency, lengths[index + 1], average
+                )
+                heapq.heapreplace(heads, (impact, frequency, index + 1))
+            else:
+                heapq.heappop(heads)
+
+    def peak(self) -> int:
+        """Get highest frequency of the word in an acronym."""
+        return max(self.groups)
+
+    def remove(self, id_: int, length: int) -> None:
+        """Forget acronym."""
+        frequency = self.repeats.pop(id_, 1)
+        lengths, ids = self.groups[frequency]
+        index = find(lengths, ids, id_, length)
+        del lengths[index], ids[index]
+        if not ids:
+            del self.groups[frequency]
+        self.size -= 1
+
+
+class WordIndex:
+    """
+    Inverted index from phrase and description words to acronyms.
+
+    Searches return the best acronyms by BM25 score of the query words, plus a
+    boost for abbreviations equal to or starting with the query. Postings of
+    the rarest query word are visited best first, so that the search stops as
+    soon as no remaining acronym can enter the top results.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[int, str, str]] = ()) -> None:
+        """Create index of identifier, abbreviation and text triples."""
+        self.abbreviations: Dict[str, List[int]] = {}
+        self.documents: Dict[int, Tuple[int, str]] = {}
+        self.postings: Dict[str, Postings] = {}
+        self.total = 0
+
+        entries: Dict[str, List[Tuple[int, int, int]]] = {}
+        for id_, abbreviation, text in documents:
+            length, frequencies = self.record(id_, abbreviation, text)
+            for word, frequency in frequencies.items():
+                entries.setdefault(word, []).append((frequency, length, id_))
+        for word, entries_ in entries.items():
+            self.postings[word] = Postings(entries_)
+
+    def add(self, id_: int, abbreviation: str, text: str) -> None:
+        """Record acronym with its abbreviation and searchable text."""
+        length, frequencies = self.record(id_, abbreviation, text)
+        for word, frequency in frequencies.items():
+            postings = self.postings.setdefault(word, Postings())
+            postings.add(id_, length, frequency)
+
+    def average(self) -> float:
+        """Get average number of words per acronym."""
+        return self.total / len(self.documents) if self.documents else 1
+
+    def boost(self, id_: int, query: str) -> float:
+        """Get score bonus of an acronym whose abbreviation matches query."""
+        abbreviation = self.documents[id_][1].lower()
+        if abbreviation == query:
+            return EXACT_BOOST
+        elif abbreviation.startswith(query):
+            return PREFIX_BOOST
+        return 0
+
+    def matches(self, id_: int, words_: Iterable[str]) -> bool:
+        """Check whether acronym contains every word."""
+        length = self.documents[id_][0]
+        return all(self.postings[word].contains(id_, length) for word in words_)
+
+    def record(
+        self, id_: int, abbreviation: str, text: str
+    ) -> Tuple[int, Dict[str, int]]:
+        """Store acronym and get its length and word frequencies."""
+        words_ = words(text)
+        frequencies: Dict[str, int] = {}
+        for word in words_:
+            frequencies[word] = frequencies.get(word, 0) + 1
+
+        self.abbreviations.setdefault(abbreviation.lower(), []).append(id_)
+        self.documents[id_] = (len(words_), abbreviation)
+        self.total += len(words_)
+        return len(words_), frequencies
+
+    def remove(self, id_: int, text: str) -> None:
+        """Forget acronym recorded with the searchable text."""
+        length, abbreviation = self.documents.pop(id_)
+        self.total -= length
+        ids = self.abbreviations[abbreviation.lower()]
+        ids.remove(id_)
+        if not ids:
+            del self.abbreviations[abbreviation.lower()]
+
+        for word in set(words(text)):
+            postings = self.postings[word]
+            postings.remove(id_, length)
+            if not postings.size:
+                del self.postings[word]
+
+    def score(self, id_: int, weights: Dict[str, float]) -> float:
+        """Compute BM25 score of weighted query words for an acronym."""
+        length, average = self.documents[id_][0], self.average()
+        return sum(
+            weight
+            * saturate(self.postings[word].frequency(id_), length, average)
+            for word, weight in weights.items()
+        )
+
+    def search(
+        self, query: str, limit: int, completions: Sequence[str]
+    ) -> List[int]:
+        """
+        Find identifiers of the best matching acronyms in order.
+
+        Acronyms match if their text contains every query word or if their
+        abbreviation starts with the case folded query. Completions are the
+        abbreviations starting with the query in alphabetical order, of which
+        there are fewer than limit unless more exist. Ties are ordered by
+        identifier, though ties for the last place may be cut arbitrarily.
+        """
+        words_ = sorted(
+            set(words(query)),
+            key=lambda word: (
+                self.postings[word].size if word in self.postings else 0
+            ),
+        )
+        matched = bool(words_) and all(word in self.postings for word in words_)
+        # Rarest words come first, since the first word drives the walk.
+        weights = {word: self.weight(word) for word in words_ if matched}
+
+        scores: Dict[int, float] = {}
+        for completion in completions:
+            for id_ in self.abbreviations.get(completion.lower(), []):
+                if self.boost(id_, query):
+                    scores[id_] = (
+                        self.score(id_, weights)
+                        if matched and self.matches(id_, words_)
+                        else 0
+                    )
+
+        if matched:
+            # Abbreviation hits beyond the completions can still contain
+            # every query word, in which case they are found by the walk.
+            extra = PREFIX_BOOST if len(completions) >= limit else 0
+            self.walk(weights, limit, scores, extra)
+        for id_ in scores:
+            scores[id_] += self.boost(id_, query)
+        return heapq.nsmallest(
+            limit, scores, key=lambda id_: (-scores[id_], id_)
+        )
+
+    def walk(
+        self,
+        weights: Dict[str, float],
+        limit: int,
+        scores: Dict[int, float],
+        extra: float,
+    ) -> None:
+        """
+        Score acronyms containing every word, rarest word first.
+
+        Acronyms of the rarest word are visited by decreasing score of that
+        word. The walk stops once no remaining acronym can beat the current
+        top results, neither with that score plus the best score of the other
+        words nor with the best score of all words for its length.
+        """
+        (first, weight), *others = weights.items()
+        average = self.average()
+        postings = [self.postings[word] for word, _ in others]
+        peaks = [(weight, self.postings[first].peak())]
+        peaks += [
+            (weight_, postings_.peak())
+            for (_, weight_), postings_ in zip(others, postings)
+        ]
+        # Acronyms longer than the sum of peak frequencies score less than
+        # shorter ones, so no longer length needs checking.
+        longest = sum(peak for _, peak in peaks)
+        limits: Dict[int, Tuple[float, float]] = {}
+
+        # Min heap of the best scores, whose root is the score to beat.
+        best: List[float] = []
+        bound = (0.0, 0, math.inf)
+        for id_, length, impact, shortest in self.postings[first].merge(
+            weight, average
+        ):
+            if len(best) >= limit:
+                if bound[:2] != (impact, shortest):
+                    highest = 0.0
+                    for length_ in range(
+                        max(shortest, len(peaks)), max(shortest, longest) + 1
+                    ):
+                        if length_ not in limits:
+                            limits[length_] = (
+                                allocate(peaks, length_, average),
+                                allocate(peaks[1:], length_ - 1, average),
+                            )
+                        full, rest = limits[length_]
+                        highest = max(highest, min(full, impact + rest))
+                    bound = (impact, shortest, highest)
+                # Stopping at ties with the threshold skips the long runs of
+                # equally scored acronyms, whose order within a group is by
+                # identifier anyway.
+                if bound[2] + extra <= best[0] + 1e-9:
+                    return
+
+            if all(postings_.contains(id_, length) for postings_ in postings):
+                score = self.score(id_, weights)
+                scores[id_] = score
+                # Boosts only raise scores, so the threshold stays a lower
+                # bound for the final top results.
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+
+    def weight(self, word: str) -> float:
+        """Get inverse document frequency of a word."""
+        count = self.postings[word].size
+        return math.log(1 + (len(self.documents) - count + 0.5) / (count + 0.5))
+
+
+def allocate(
+    peaks: Sequence[Tuple[float, int]], length: int, average: float
+) -> float:
+    """
+    Get highest score of weighted words sharing an acronym of a length.
+
+    Each word occurs at least once and at most its peak frequency. Remaining
+    words of the acronym go one at a time to the word gaining the most, which
+    is optimal since word scores saturate with frequency.
+    """
+    frequencies = [1] * len(peaks)
+    for _ in range(length - len(peaks)):
+        gains = [
+            (
+                weight
+                * (
+                    saturate(frequency + 1, length, average)
+                    - saturate(frequency, length, average)
+                ),
+                index,
+            )
+            for index, ((weight, peak), frequency) in enumerate(
+                zip(peaks, frequencies)
+            )
+            if frequency < peak
+        ]
+        if not gains:
+            break
+        frequencies[max(gains)[1]] += 1
+
+    return sum(
+        weight * saturate(frequency, length, average)
+        for (weight, _), frequency in zip(peaks, frequencies)
+    )
+
+
+def find(lengths: array, ids: array, id_: int, length: int) -> int:
+    """Get position of acronym in a postings group or its insertion point."""
+    start = bisect.bisect_left(lengths, length)
+    stop = bisect.bisect_right(lengths, length, start)
+    return bisect.bisect_left(ids, id_, start, stop)
+
+
+def saturate(frequency: int, length: int, average: float) -> float:
+    """Get BM25 term frequency component of a word in an acronym."""
+    norm = K1 * (1 - B + B * length / average)
+    return frequency * (K1 + 1) / (frequency + norm)
+
+
+def words(text: str) -> List[str]:
+    """Split text into its case folded words."""
+    return re.findall(r"\w+", text.lower())
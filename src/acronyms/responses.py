@@ -0,0 +1,19 @@
+"""Custom response classes."""
+
+
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import ORJSONResponse
+
+
+class ContentResponse(ORJSONResponse):
+    """JSON response serialized with orjson that keeps its content."""
+
+    def __init__(
+        self, content: Any, headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """Create response and render content to bytes."""
+        self.content = content
+        super().__init__(
+            content, headers=None if headers is None else dict(headers)
+        )
@@ -1,20 +1,63 @@
 """Acronyms REST API endpoints."""
 
 
+import csv
+import io
 import sys
-from typing import Dict, Optional, Sequence, Union, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
-from fastapi_cache import FastAPICache, decorator
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+import orjson
 import sqlalchemy
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 
-from acronyms import models, settings
+from acronyms import (
+    batch,
+    cache,
+    indexes,
+    models,
+    pagination,
+    search,
+    settings,
+    suggest,
+)
 from acronyms.models import Acronym, AcronymColumn
-from acronyms.schemas import AcronymBody, AcronymResponse
+from acronyms.pagination import CountMode
+from acronyms.responses import ContentResponse
+from acronyms.schemas import (
+    AcronymBody,
+    AcronymLookup,
+    AcronymOperation,
+    AcronymResponse,
+    AcronymResult,
+    AcronymSuggestions,
+)
 
 
+FIELDS = ("abbreviation", "description", "id", "phrase")
+COLUMNS = [getattr(Acronym, field) for field in FIELDS]
+ExportFormat = Literal["csv", "ndjson"]
 router = APIRouter()
 
 
@@ -36,18 +79,253 @@ async def delete_acronym(
             status_code=404, detail=str(exception)
         ) from exception
 
+    change = cache.Change.of(acronym)
     await session.delete(acronym)
+    await search.index_acronyms(session, [id])
     await session.commit()
-    await FastAPICache.clear(namespace="acronyms")
+    await cache.invalidate([change])
     return {"ok": True}
 
 
+@router.post(
+    "/acronyms/batch",
+    responses={409: {"description": "Concurrent conflicting acronym write"}},
+)
+async def post_acronyms_batch(
+    operations: List[AcronymOperation] = Body(max_length=1000),
+    session: AsyncSession = Depends(models.get_session),
+) -> List[AcronymResult]:
+    """
+    Apply insert, update and delete operations in one transaction.
+
+    Operations run in order. Each gets its own result, so conflicting or
+    missing acronyms do not abort the rest of the batch.
+    """
+    try:
+        results, changes = await batch.apply(session, operations)
+        await session.commit()
+    except (IntegrityError, StaleDataError) as exception:
+        raise HTTPException(
+            status_code=409, detail="Concurrent conflicting acronym write"
+        ) from exception
+
+    await cache.invalidate(changes)
+    return results
+
+
+@router.get(
+    "/acronyms/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "Stream of matching acronyms ordered by id",
+        }
+    },
+)
+async def get_acronyms_export(
+    abbreviation: Optional[str] = None,
+    phrase: Optional[str] = None,
+    format: ExportFormat = "ndjson",  # noqa: A002
+    session: AsyncSession = Depends(models.get_read_session),
+) -> StreamingResponse:
+    """
+    Stream all matching acronyms as NDJSON or CSV.
+
+    Rows are fetched in batches from a server side cursor, so memory use does
+    not depend on the number of exported acronyms.
+    """
+    statement = (
+        search.query(session, abbreviation, phrase)
+        .with_only_columns(
+            Acronym.id,
+            Acronym.abbreviation,
+            Acronym.description,
+            Acronym.phrase,
+        )
+        .order_by(Acronym.id)
+        .execution_options(yield_per=1000)
+    )
+    result = await session.stream(statement)
+
+    async def lines() -> AsyncIterator[Union[bytes, str]]:
+        if format == "csv":
+            yield "id,abbreviation,description,phrase\r\n"
+        async for rows in result.partitions():
+            if format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield b"".join(
+                    orjson.dumps(
+                        row._asdict(), option=orjson.OPT_APPEND_NEWLINE
+                    )
+                    for row in rows
+                )
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        lines(),
+        headers={
+            "Content-Disposition": f"attachment; filename=acronyms.{format}"
+        },
+        media_type=media_type,
+    )
+
+
+@router.get(
+    "/acronyms/lookup",
+    dependencies=[Depends(cache.conditional)],
+    response_model=AcronymLookup,
+    responses={304: {"description": "Acronyms not modified since ETag"}},
+)
+async def get_acronyms_lookup(
+    response: Response,
+    abbreviation: List[str] = Query(
+        default=[],
+        description="Exact abbreviations to find acronyms for",
+        max_length=100,
+    ),
+    id: List[int] = Query(  # noqa: A002
+        default=[],
+        description="Identifiers of acronyms to find",
+        max_length=100,
+    ),
+    session: AsyncSession = Depends(models.get_read_session),
+) -> ContentResponse:
+    """
+    Get acronyms for many identifiers and exact abbreviations at once.
+
+    Results are grouped by requested key. Keys missing from the cache are
+    resolved together with one indexed query.
+    """
+
+    async def load(keys: List[cache.Key]) -> Dict[cache.Key, Any]:
+        ids = {term for field, term in keys if field == "id"}
+        abbreviations = {term for field, term in keys if field != "id"}
+        result = await session.execute(
+            sqlalchemy.select(*COLUMNS)
+            .where(
+                sqlalchemy.or_(
+                    Acronym.id.in_(ids),
+                    Acronym.abbreviation.in_(abbreviations),
+                )
+            )
+            .order_by(Acronym.id)
+        )
+
+        values: Dict[cache.Key, Any] = {key: None for key in keys}
+        values.update({key: [] for key in keys if key[0] != "id"})
+        for row in result:
+            acronym = dict(zip(FIELDS, row))
+            if row.id in ids:
+                values[("id", row.id)] = acronym
+            if row.abbreviation in abbreviations:
+                values[("abbreviation", row.abbreviation)].append(acronym)
+        return values
+
+    keys: List[cache.Key] = [("abbreviation", term) for term in abbreviation]
+    keys += [("id", id_) for id_ in id]
+    values = await cache.cache_many(
+        "get_acronyms_lookup",
+        keys,
+        load,
+        cache.acronym_lookup_dependencies,
+        expire=60,
+        response=response,
+    )
+    return ContentResponse(
+        {
+            "abbreviations": {
+                term: values[("abbreviation", term)] for term in abbreviation
+            },
+            "ids": {str(id_): values[("id", id_)] for id_ in id},
+        },
+        headers=response.headers,
+    )
+
+
+@router.get(
+    "/acronym/search",
+    response_model=List[AcronymResponse],
+    responses={404: {"description": "Ranked search is disabled"}},
+)
+async def get_acronym_search(
+    query: str = Query(
+        description="Words to find in phrases and descriptions, or the "
+        "start of an abbreviation",
+        max_length=300,
+        min_length=1,
+    ),
+    limit: int = Query(
+        default=settings.settings().page_size,
+        description="Maximum number of acronyms to return",
+        gt=0,
+        le=50,
+    ),
+    offset: int = Query(default=0, ge=0, le=1000),
+    session: AsyncSession = Depends(models.get_read_session),
+) -> ContentResponse:
+    """
+    Get acronyms matching a query, best first.
+
+    Acronyms match if their phrase and description contain every query word
+    or if their abbreviation starts with the query. Matches are ranked by
+    BM25 relevance, with exact and prefix abbreviation matches boosted.
+    Ranking uses an in memory word index, so the database only loads the
+    returned acronyms by identifier.
+    """
+    if not settings.settings().search_word_index:
+        raise HTTPException(status_code=404, detail="Ranked search is disabled")
+    ids = indexes.current().rank(query, offset + limit)[offset:]
+    result = await session.execute(
+        sqlalchemy.select(*COLUMNS).where(Acronym.id.in_(ids))
+    )
+    acronyms = {row.id: dict(zip(FIELDS, row)) for row in result}
+    return ContentResponse([acronyms[id_] for id_ in ids if id_ in acronyms])
+
+
+@router.get("/acronym/suggest", response_model=AcronymSuggestions)
+async def get_acronym_suggest(
+    prefix: str = Query(
+        description="Start of an abbreviation or of a phrase word",
+        max_length=suggest.KEY_LENGTH,
+        min_length=1,
+    ),
+    limit: int = Query(
+        default=10,
+        description="Maximum number of completions per column",
+        gt=0,
+        le=50,
+    ),
+) -> ContentResponse:
+    """
+    Get abbreviation and phrase completions of a prefix.
+
+    Completions come from an in memory index in alphabetical order, so no
+    database query is made.
+    """
+    return ContentResponse(indexes.current().suggest(prefix, limit))
+
+
 @router.get(
     "/acronym",
+    dependencies=[Depends(cache.conditional)],
     response_model=Union[AcronymResponse, Sequence[AcronymResponse], None],
-    responses={404: {"description": "Acronym entry not found"}},
+    responses={
+        304: {"description": "Acronyms not modified since ETag"},
+        400: {"description": "Invalid pagination cursor or disabled search"},
+        404: {"description": "Acronym entry not found"},
+    },
+)
+@cache.cache(
+    expire=60,
+    namespace="acronyms",
+    dependencies=cache.acronym_dependencies,
+    key=cache.acronym_key,
+    headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Mode"],
 )
-@decorator.cache(expire=60, namespace="acronyms")
 async def get_acronym(
     response: Response,
     id: Optional[int] = Query(default=None, ge=0, le=sys.maxsize),  # noqa: A002
@@ -60,42 +338,91 @@ async def get_acronym(
         le=50,
     ),
     offset: int = Query(default=0, ge=0, le=sys.maxsize),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Position after which to return acronyms, taken from "
+        "the X-Next-Cursor header of the previous page",
+    ),
     order: Optional[AcronymColumn] = None,
-    session: AsyncSession = Depends(models.get_session),
-) -> Union[Acronym, Sequence[Acronym], None]:
-    """Get all matching acronyms."""
+    fuzzy: bool = Query(
+        default=False,
+        description="Whether abbreviations also match typos within a small "
+        "edit distance",
+    ),
+    total: CountMode = Query(
+        default="exact",
+        description="Whether X-Total-Count is exact or approximate",
+    ),
+    session: AsyncSession = Depends(models.get_read_session),
+) -> ContentResponse:
+    """
+    Get all matching acronyms.
+
+    Pages can be selected by offset or, in constant time regardless of depth,
+    by cursor. A cursor for the following page is returned in the
+    X-Next-Cursor header whenever more acronyms remain. The total is computed
+    in the same round trip as the page and its kind is given by the
+    X-Total-Count-Mode header.
+    """
+    if fuzzy and not settings.settings().search_typo_index:
+        raise HTTPException(status_code=400, detail="Fuzzy search is disabled")
+
+    # Plain column rows are encoded directly, which skips ORM object loading
+    # and response model validation.
     if id is not None:
-        statement = sqlalchemy.select(Acronym).where(Acronym.id == id)
+        statement = sqlalchemy.select(*COLUMNS).where(Acronym.id == id)
         try:
-            return (await session.execute(statement)).scalar_one()
+            row = (await session.execute(statement)).one()
         except NoResultFound as exception:
             raise HTTPException(
                 status_code=404, detail=str(exception)
             ) from exception
+        return ContentResponse(row._asdict(), headers=response.headers)
 
-    table = sqlalchemy.select(Acronym)
-    if abbreviation is None and phrase is None:
-        query = table
-    elif abbreviation is None:
-        query = table.where(Acronym.phrase.contains(phrase))
-    elif phrase is None:
-        query = table.where(Acronym.abbreviation.contains(abbreviation))
+    query = search.query(
+        session, abbreviation, phrase, fuzzy
+    ).with_only_columns(*COLUMNS)
+    estimate = None
+    if total == "approximate":
+        estimate = await pagination.estimate(session, query)
+
+    statement = query
+    if cursor is not None:
+        try:
+            statement = statement.where(pagination.after(order, cursor))
+        except ValueError as exception:
+            raise HTTPException(
+                status_code=400, detail=str(exception)
+            ) from exception
+    if estimate is None:
+        statement = statement.add_columns(pagination.count(query, total))
+
+    # Fetch one extra row to find whether a following page exists.
+    result = await session.execute(
+        statement.order_by(*pagination.ordering(order))
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    rows = result.all()
+
+    if estimate is not None:
+        count, mode = str(estimate), "estimate"
     else:
-        query = table.where(
-            sqlalchemy.or_(
-                Acronym.abbreviation.contains(abbreviation),
-                Acronym.phrase.contains(phrase),
-            )
+        count_ = await pagination.page_total(
+            session, query, rows, total, start=offset == 0 and cursor is None
         )
+        count, mode = pagination.count_headers(count_, total)
+    response.headers["X-Total-Count"] = count
+    response.headers["X-Total-Count-Mode"] = mode
 
-    count = await session.execute(
-        query.with_only_columns(sqlalchemy.func.count(Acronym.id))
-    )
-    response.headers["X-Total-Count"] = str(count.scalar_one())
-    result = await session.execute(
-        query.order_by(order).offset(offset).limit(limit)
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = pagination.encode(
+            order, rows[limit - 1]
+        )
+    return ContentResponse(
+        [dict(zip(FIELDS, row)) for row in rows[:limit]],
+        headers=response.headers,
     )
-    return result.scalars().all()
 
 
 @router.post(
@@ -109,8 +436,10 @@ async def post_acronym(
 
     try:
         session.add(acronym_)
+        await session.flush()
+        await search.index_acronyms(session, [cast(int, acronym_.id)])
         await session.commit()
-        await FastAPICache.clear(namespace="acronyms")
+        await cache.invalidate([cache.Change.of(acronym_)])
 
         # Id is not None since session committed the acronym.
         return cast(int, acronym_.id)
@@ -130,6 +459,8 @@ async def put_acronym(
     session: AsyncSession = Depends(models.get_session),
 ) -> Dict[str, bool]:
     """Get all matching acronyms."""
+    previous = await session.get(Acronym, id)
+    changes = [] if previous is None else [cache.Change.of(previous)]
     try:
         statement = (
             sqlalchemy.update(Acronym)
@@ -137,9 +468,11 @@ async def put_acronym(
             .values(**body.dict())
         )
         await session.execute(statement)
+        await search.index_acronyms(session, [id])
 
         await session.commit()
-        await FastAPICache.clear(namespace="acronyms")
+        changes.append(cache.Change(id, body.abbreviation, body.phrase))
+        await cache.invalidate(changes)
     except IntegrityError as exception:
         raise HTTPException(
             status_code=409, detail="Duplicate acronym request"
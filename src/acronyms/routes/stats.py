@@ -0,0 +1,24 @@
+"""Application statistics REST API endpoints."""
+
+
+from typing import Dict
+
+from fastapi import APIRouter
+
+from acronyms import cache
+from acronyms.cache import Counter
+
+
+router = APIRouter()
+
+
+@router.get("/stats/cache")
+async def get_cache_stats() -> Dict[str, Counter]:
+    """Get lookup statistics of each cache tier."""
+    return cache.statistics()
+
+
+@router.get("/stats/cache/routes")
+async def get_cache_route_stats() -> Dict[str, Counter]:
+    """Get lookup statistics of each cached route."""
+    return cache.route_counters()
@@ -1,7 +1,7 @@
 """Rest data schemas."""
 
 
-from typing import Optional
+from typing import Annotated, Dict, List, Literal, Optional, Union
 from uuid import UUID
 
 from fastapi_users.schemas import BaseUser, BaseUserCreate, BaseUserUpdate
@@ -27,6 +27,34 @@ class AcronymBody(BaseModel):
     phrase: str = Field(title="Acronym phrase", max_length=300, min_length=1)
 
 
+class AcronymDelete(BaseModel):
+    """Batch operation to remove an acronym."""
+
+    action: Literal["delete"]
+    id: int = Field(ge=0)  # noqa: A003
+
+
+class AcronymInsert(BaseModel):
+    """Batch operation to insert an acronym."""
+
+    acronym: AcronymBody
+    action: Literal["insert"]
+
+
+class AcronymUpdate(BaseModel):
+    """Batch operation to replace an acronym."""
+
+    acronym: AcronymBody
+    action: Literal["update"]
+    id: int = Field(ge=0)  # noqa: A003
+
+
+AcronymOperation = Annotated[
+    Union[AcronymDelete, AcronymInsert, AcronymUpdate],
+    Field(discriminator="action"),
+]
+
+
 class AcronymResponse(BaseModel):
     """Response validator for Acronym type."""
 
@@ -39,6 +67,27 @@ class AcronymResponse(BaseModel):
     phrase: str = Field(title="Acronym phrase", max_length=300, min_length=1)
 
 
+class AcronymLookup(BaseModel):
+    """Response validator for batch acronym lookups."""
+
+    abbreviations: Dict[str, List[AcronymResponse]]
+    ids: Dict[int, Optional[AcronymResponse]]
+
+
+class AcronymResult(BaseModel):
+    """Outcome of a batch operation."""
+
+    id: Optional[int] = None  # noqa: A003
+    status: Literal["ok", "conflict", "not_found"]
+
+
+class AcronymSuggestions(BaseModel):
+    """Response validator for prefix completions."""
+
+    abbreviations: List[str]
+    phrases: List[str]
+
+
 class UserRead(BaseUser[UUID]):
     """Readable user data."""
 
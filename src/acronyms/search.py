@@ -0,0 +1,279 @@
+"""Substring search engine for acronym columns."""
+
+
+import functools
+import re
+import sqlite3
+from typing import (
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    cast,
+)
+
+import sqlalchemy
+from sqlalchemy import ColumnElement, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from acronyms import indexes, models, settings
+from acronyms.models import Acronym
+
+
+SearchField = Literal["abbreviation", "phrase"]
+FIELDS: List[SearchField] = ["abbreviation", "phrase"]
+# External content FTS5 table kept in sync with the acronyms table by triggers.
+# Diacritics are kept so that matches remain a subset of substring matches.
+FTS_TABLE = """
+CREATE VIRTUAL TABLE acronyms_fts USING fts5(
+    abbreviation,
+    phrase,
+    content='acronyms',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 0'
+)
+"""
+# Triggers that keep an external content FTS5 table in sync with acronyms.
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS {table}_insert AFTER INSERT ON acronyms
+    BEGIN
+        INSERT INTO {table} (rowid, abbreviation, phrase)
+        VALUES (new.id, new.abbreviation, new.phrase);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {table}_delete AFTER DELETE ON acronyms
+    BEGIN
+        INSERT INTO {table} ({table}, rowid, abbreviation, phrase)
+        VALUES ('delete', old.id, old.abbreviation, old.phrase);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {table}_update AFTER UPDATE ON acronyms
+    BEGIN
+        INSERT INTO {table} ({table}, rowid, abbreviation, phrase)
+        VALUES ('delete', old.id, old.abbreviation, old.phrase);
+        INSERT INTO {table} (rowid, abbreviation, phrase)
+        VALUES (new.id, new.abbreviation, new.phrase);
+    END
+    """,
+]
+FTS_TRIGGERS = [trigger.format(table="acronyms_fts") for trigger in TRIGGERS]
+# External content FTS5 table whose trigram tokens match any substring of at
+# least three characters, ignoring case.
+TRIGRAM_TABLE = """
+CREATE VIRTUAL TABLE acronyms_trigram USING fts5(
+    abbreviation,
+    phrase,
+    content='acronyms',
+    content_rowid='id',
+    tokenize='trigram'
+)
+"""
+TRIGRAM_TRIGGERS = [
+    trigger.format(table="acronyms_trigram") for trigger in TRIGGERS
+]
+
+
+def condition(
+    session: AsyncSession, field: SearchField, term: str
+) -> ColumnElement[bool]:
+    """
+    Build filter for acronyms whose field contains the search term.
+
+    Matching ignores case. PostgreSQL answers the ILIKE filter from its trigram
+    GIN indexes. On SQLite the FTS5 trigram table finds the rows containing the
+    term, which the ILIKE filter then verifies. In FTS mode, SQLite instead
+    matches every word of the term as a token prefix.
+    """
+    column: ColumnElement[str] = getattr(Acronym, field)
+    contains = column.ilike(f"%{term}%")
+    mode = settings.settings().search
+    if mode == "contains" or dialect(session) != "sqlite":
+        return contains
+    elif mode == "fts":
+        name, query = "acronyms_fts", match_query(field, term)
+        available = fts5_available()
+    else:
+        name, query = "acronyms_trigram", substring_query(field, term)
+        available = fts5_available("trigram")
+    if query is None or not available:
+        return contains
+
+    rowid = sqlalchemy.literal_column("rowid", sqlalchemy.Integer)
+    table = sqlalchemy.literal_column(name, sqlalchemy.Unicode)
+    matches = (
+        sqlalchemy.select(rowid)
+        .select_from(sqlalchemy.table(name))
+        .where(table.op("MATCH")(query))
+    )
+    if mode == "fts":
+        return cast(ColumnElement[bool], Acronym.id.in_(matches))
+    return sqlalchemy.and_(Acronym.id.in_(matches), contains)
+
+
+async def create_table(
+    session: AsyncSession, name: str, table: str, triggers: List[str]
+) -> None:
+    """Create and populate FTS5 table if absent along with its triggers."""
+    exists = await session.execute(
+        sqlalchemy.text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+        {"name": name},
+    )
+    if exists.scalar() is None:
+        await session.execute(sqlalchemy.text(table))
+        await session.execute(
+            sqlalchemy.text(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+        )
+    for trigger in triggers:
+        await session.execute(sqlalchemy.text(trigger))
+
+
+def dialect(session: AsyncSession) -> str:
+    """Get name of database dialect behind session."""
+    return session.get_bind().dialect.name
+
+
+async def drop_table(session: AsyncSession, name: str) -> None:
+    """Drop FTS5 table and its triggers if present."""
+    for event in ["insert", "delete", "update"]:
+        await session.execute(
+            sqlalchemy.text(f"DROP TRIGGER IF EXISTS {name}_{event}")
+        )
+    await session.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@functools.lru_cache(maxsize=None)
+def fts5_available(tokenizer: str = "unicode61") -> bool:
+    """Check whether the SQLite library has FTS5 with a tokenizer."""
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute(
+            f"CREATE VIRTUAL TABLE probe USING fts5(text, tokenize={tokenizer})"
+        )
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+async def index_acronyms(session: AsyncSession, ids: Iterable[int]) -> None:
+    """
+    Refresh search indexes for acronyms within the session transaction.
+
+    In memory indexes are updated once the transaction commits. SQLite search
+    tables are kept in sync by triggers.
+    """
+    ids_ = list(ids)
+    if not ids_:
+        return
+
+    result = await session.execute(
+        sqlalchemy.select(
+            Acronym.id,
+            Acronym.abbreviation,
+            Acronym.phrase,
+            Acronym.description,
+        ).where(Acronym.id.in_(ids_))
+    )
+    indexes.stage(session, ids_, result.all())
+
+
+async def initialize_index() -> None:
+    """
+    Create SQLite search tables of the configured search mode.
+
+    FTS5 tables are populated once created and then kept in sync with the
+    acronyms table by triggers. Tables of other modes are dropped, so that
+    writes stop maintaining them.
+    """
+    async with AsyncSession(models.get_engine()) as session:
+        if dialect(session) != "sqlite":
+            return
+
+        mode = settings.settings().search
+        if mode == "fts" and fts5_available():
+            await create_table(session, "acronyms_fts", FTS_TABLE, FTS_TRIGGERS)
+        else:
+            await drop_table(session, "acronyms_fts")
+        if mode == "trigram" and fts5_available("trigram"):
+            await create_table(
+                session, "acronyms_trigram", TRIGRAM_TABLE, TRIGRAM_TRIGGERS
+            )
+        else:
+            await drop_table(session, "acronyms_trigram")
+        await session.commit()
+
+
+def match_query(field: SearchField, term: str) -> Optional[str]:
+    """
+    Convert search term to FTS5 query of prefix matches on a column.
+
+    Returns None if the term has no searchable words.
+    """
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+    prefixes = " ".join(f'"{word}"*' for word in words)
+    return f"{field} : ({prefixes})"
+
+
+def normalize(term: Optional[str]) -> Optional[str]:
+    """Trim and case fold search term, since matching ignores case."""
+    return None if term is None else term.strip().lower()
+
+
+def query(
+    session: AsyncSession,
+    abbreviation: Optional[str],
+    phrase: Optional[str],
+    fuzzy: bool = False,
+) -> Select[Tuple[Acronym]]:
+    """
+    Select acronyms matching either normalized search term.
+
+    Fuzzy queries also match abbreviations that are typos of the term.
+    """
+    abbreviation, phrase = normalize(abbreviation), normalize(phrase)
+    conditions = []
+    if abbreviation is not None:
+        conditions.append(condition(session, "abbreviation", abbreviation))
+        if fuzzy:
+            conditions.append(typos(abbreviation))
+    if phrase is not None:
+        conditions.append(condition(session, "phrase", phrase))
+
+    statement = sqlalchemy.select(Acronym)
+    if conditions:
+        statement = statement.where(sqlalchemy.or_(*conditions))
+    return statement
+
+
+def substring_query(field: SearchField, term: str) -> Optional[str]:
+    """
+    Convert search term to FTS5 trigram query for substrings of a column.
+
+    Returns None if the term is too short for trigrams or has LIKE wildcards.
+    """
+    if len(term) < 3 or "%" in term or "_" in term:
+        return None
+    quoted = term.replace('"', '""')
+    return f'{field} : "{quoted}"'
+
+
+def typos(term: str) -> ColumnElement[bool]:
+    """
+    Build filter for acronyms with abbreviations close to the term.
+
+    Abbreviations within the configured edit distance are found in the in
+    memory typo index, so the database only matches them exactly. Nothing
+    matches if the typo index is disabled.
+    """
+    index = indexes.current().typos
+    if index is None:
+        return sqlalchemy.false()
+    texts = index.search(term, settings.settings().search_distance)
+    return Acronym.abbreviation.in_(texts)
@@ -6,9 +6,19 @@ import os
 from pathlib import Path
 import secrets
 import sys
-from typing import Any, Dict, Literal, Optional, Tuple, Type, Union, cast
+from typing import (
+    Any,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
-from pydantic import SecretStr
+from pydantic import RedisDsn, SecretStr
 from pydantic.fields import FieldInfo
 from pydantic_settings import (
     BaseSettings,
@@ -38,9 +48,27 @@ def secrets_directory() -> Optional[str]:
 class Settings(BaseSettings):
     """Application settings."""
 
+    cache: Literal["memory", "redis"] = "memory"
+    cache_local_size: int = 1000
+    cache_max_age: int = 0
+    cache_memory: int = 64 * 2**20
+    cache_size: int = 10000
+    count_limit: int = 1000
     database: Union[PostgresDsn, SqliteDsn] = SqliteDsn(
         "sqlite+aiosqlite:///./acronyms.db"
     )
+    database_max_overflow: int = 10
+    database_pgbouncer: bool = False
+    database_pool_pre_ping: bool = False
+    database_pool_recycle: int = -1
+    database_pool_size: int = 5
+    database_pool_timeout: float = 30
+    database_replica_lag: int = 5
+    database_replicas: List[Union[PostgresDsn, SqliteDsn]] = []
+    # Tuned SQLite files use WAL journaling, separate read only connections
+    # and a single writer connection that queues concurrent writes.
+    database_sqlite_tuning: bool = False
+    database_statement_cache_size: int = 100
     host: str = "127.0.0.1"
     log_level: Literal[
         "critical", "error", "warning", "info", "debug", "trace"
@@ -52,15 +80,31 @@ class Settings(BaseSettings):
     )
     page_size: int = 10
     port: int = 8000
+    redis: RedisDsn = RedisDsn("redis://localhost:6379/0")
     reset_token: SecretStr = SecretStr(secrets.token_urlsafe(32))
+    search: Literal["contains", "fts", "trigram"] = "trigram"
+    search_distance: int = 1
+    search_refresh: int = 300
+    # The typo index for fuzzy abbreviation search holds every deletion variant
+    # of each abbreviation, about 450 bytes per acronym.
+    search_typo_index: bool = False
+    # The word index for ranked search holds postings of every phrase and
+    # description word, about 350 bytes per acronym.
+    search_word_index: bool = False
+    smtp_backoff: float = 1
+    smtp_claim_timeout: float = 600
+    smtp_concurrency: int = 2
     smtp_enabled: bool = False
     smtp_host: str = ""
+    smtp_outbox: bool = False
     smtp_password: SecretStr = SecretStr("")
     smtp_port: int = 25
+    smtp_retries: int = 3
     smtp_tls: bool = True
     smtp_username: str = ""
     ssl_certfile: Optional[Path] = None
     ssl_keyfile: Optional[Path] = None
+    token_cache_ttl: int = 60
     verification_token: SecretStr = SecretStr(secrets.token_urlsafe(64))
 
     @classmethod
@@ -0,0 +1,105 @@
+"""Prefix index for acronym autocompletion."""
+
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+BUCKET_SIZE = 1000
+# Keys are truncated, since prefixes longer than this are not accepted.
+KEY_LENGTH = 50
+
+
+class PrefixIndex:
+    """
+    Sorted completion keys of one column with bisect prefix lookups.
+
+    Keys are split into buckets of bounded size, so that writes move at most a
+    bucket of entries instead of the whole index. Each bucket keeps keys and
+    the texts they complete in parallel lists, which saves a tuple per key.
+    Acronyms sharing a value add duplicate keys, so the value stays suggested
+    until the last of them is removed.
+    """
+
+    def __init__(self, pairs: Sequence[Tuple[str, str]] = ()) -> None:
+        """Create index from key and text pairs sorted by key."""
+        self.buckets: List[Tuple[List[str], List[str]]] = []
+        for start in range(0, len(pairs), BUCKET_SIZE):
+            chunk = pairs[start : start + BUCKET_SIZE]
+            self.buckets.append(
+                ([pair[0] for pair in chunk], [pair[1] for pair in chunk])
+            )
+        self.firsts = [keys[0] for keys, _ in self.buckets]
+
+    def add(self, keys: Iterable[str], text: str) -> None:
+        """Record text under each key."""
+        for key in keys:
+            if not self.buckets:
+                self.buckets.append(([], []))
+                self.firsts.append(key)
+
+            bucket = max(bisect.bisect_right(self.firsts, key) - 1, 0)
+            keys_, texts = self.buckets[bucket]
+            index = bisect.bisect_right(keys_, key)
+            keys_.insert(index, key)
+            texts.insert(index, text)
+            self.firsts[bucket] = keys_[0]
+
+            if len(keys_) > 2 * BUCKET_SIZE:
+                self.buckets.insert(
+                    bucket + 1, (keys_[BUCKET_SIZE:], texts[BUCKET_SIZE:])
+                )
+                self.firsts.insert(bucket + 1, keys_[BUCKET_SIZE])
+                del keys_[BUCKET_SIZE:], texts[BUCKET_SIZE:]
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """Find texts of at most limit distinct keys starting with prefix."""
+        texts: Dict[str, None] = {}
+        bucket = max(bisect.bisect_left(self.firsts, prefix) - 1, 0)
+        for number in range(bucket, len(self.buckets)):
+            keys, texts_ = self.buckets[number]
+            index = bisect.bisect_left(keys, prefix)
+            while index < len(keys):
+                key = keys[index]
+                if len(texts) >= limit or not key.startswith(prefix):
+                    return list(texts)
+                texts.setdefault(texts_[index])
+                # Duplicate keys complete to the same text up to case, so
+                # only the first of them is used.
+                index = bisect.bisect_right(keys, key, index)
+        return list(texts)
+
+    def remove(self, keys: Iterable[str], text: str) -> None:
+        """Forget text under each key."""
+        for key in keys:
+            # Duplicate keys can span buckets, so the search starts at the
+            # first bucket that may hold the key.
+            bucket = max(bisect.bisect_left(self.firsts, key) - 1, 0)
+            keys_, texts = self.buckets[bucket]
+            index = bisect.bisect_left(keys_, key)
+            while index == len(keys_) or texts[index] != text:
+                if index == len(keys_):
+                    bucket, index = bucket + 1, 0
+                    keys_, texts = self.buckets[bucket]
+                else:
+                    index += 1
+
+            del keys_[index], texts[index]
+            if keys_:
+                self.firsts[bucket] = keys_[0]
+            else:
+                del self.buckets[bucket], self.firsts[bucket]
+
+
+def abbreviation_keys(abbreviation: str) -> List[str]:
+    """Get completion keys of an abbreviation."""
+    return [abbreviation.lower()[:KEY_LENGTH]]
+
+
+def phrase_keys(phrase: str) -> List[str]:
+    """Get completion keys of a phrase starting at each of its words."""
+    text = phrase.lower()
+    starts = {match.start() for match in re.finditer(r"\w+", text)}
+    keys = [text[start : start + KEY_LENGTH] for start in sorted(starts)]
+    return keys or [text[:KEY_LENGTH]]
@@ -0,0 +1,339 @@
+"""Load generator that simulates frontend traffic against a server."""
+
+
+import asyncio
+import bisect
+import math
+import random
+import secrets
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+from pydantic import BaseModel
+
+
+# Upper bounds in milliseconds of latency histogram buckets.
+BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf]
+
+
+class Profile(BaseModel):
+    """Behavior of virtual users and objectives for their requests."""
+
+    debounce: float = 0.5
+    duration: float = 60
+    edit_rate: float = 0.05
+    keystroke: float = 0.15
+    login_rate: float = 0.2
+    pages: int = 3
+    ramp: float = 10
+    slo_errors: float = 1
+    slo_p95: float = 250
+    slo_p99: float = 1000
+    think: float = 2
+    timeout: float = 30
+    users: int = 10
+
+
+class Route:
+    """Latencies and failures of requests to a route."""
+
+    def __init__(self) -> None:
+        """Create empty route statistics."""
+        self.durations: List[float] = []
+        self.errors = 0
+
+    def error_rate(self) -> float:
+        """Get percentage of failed requests."""
+        return 100 * self.errors / len(self.durations)
+
+    def histogram(self) -> List[int]:
+        """Count requests by latency bucket."""
+        counts = [0] * len(BUCKETS)
+        for duration in self.durations:
+            counts[bisect.bisect_left(BUCKETS, 1000 * duration)] += 1
+        return counts
+
+    def percentile(self, percent: int) -> float:
+        """Get latency percentile in milliseconds."""
+        if len(self.durations) < 2:
+            return 1000 * sum(self.durations)
+        cuts = statistics.quantiles(self.durations, n=100, method="inclusive")
+        return 1000 * cuts[percent - 1]
+
+    def record(self, duration: float, success: bool) -> None:
+        """Save latency in seconds and outcome of a request."""
+        self.durations.append(duration)
+        if not success:
+            self.errors += 1
+
+
+class Report:
+    """Request statistics by route over a load test."""
+
+    def __init__(self) -> None:
+        """Create empty report starting now."""
+        self.elapsed = 0.0
+        self.routes: Dict[str, Route] = {}
+        self.start = time.perf_counter()
+
+    def breaches(self, profile: Profile) -> List[str]:
+        """Describe every service level objective missed by a route."""
+        messages = []
+        for name, route in sorted(self.routes.items()):
+            if route.error_rate() > profile.slo_errors:
+                messages.append(
+                    f"{name} error rate {route.error_rate():.2f}% exceeds "
+                    f"{profile.slo_errors}%"
+                )
+            for percent, limit in [
+                (95, profile.slo_p95),
+                (99, profile.slo_p99),
+            ]:
+                latency = route.percentile(percent)
+                if latency > limit:
+                    messages.append(
+                        f"{name} p{percent} {latency:.1f} ms exceeds "
+                        f"{limit} ms"
+                    )
+        return messages
+
+    def render(self) -> str:
+        """Format route statistics and latency histograms as text."""
+        width = max([len(name) for name in self.routes] + [5])
+        lines = [
+            f"{'Route':<{width}} {'Requests':>9} {'Errors':>8} "
+            f"{'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8}"
+        ]
+        for name, route in sorted(self.routes.items()):
+            lines.append(
+                f"{name:<{width}} {len(route.durations):>9} "
+                f"{route.error_rate():>7.2f}% {route.percentile(50):>9.1f} "
+                f"{route.percentile(95):>9.1f} {route.percentile(99):>9.1f} "
+                f"{len(route.durations) / max(self.elapsed, 1e-9):>8.1f}"
+            )
+
+        for name, route in sorted(self.routes.items()):
+            counts = route.histogram()
+            used = [index for index, count in enumerate(counts) if count]
+            lines += ["", name]
+            for index in range(used[0], used[-1] + 1):
+                bound = (
+                    f"> {BUCKETS[index - 1]}"
+                    if math.isinf(BUCKETS[index])
+                    else f"<= {BUCKETS[index]}"
+                )
+                bar = "#" * math.ceil(40 * counts[index] / max(counts))
+                lines.append(f"  {bound:>9} ms {counts[index]:>9} {bar}")
+        return "\n".join(lines)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        route: str,
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        """
+        Send request and record its latency and outcome under a route.
+
+        Returns the response if successful. Connection failures and timeouts
+        count as errors.
+        """
+        statistics_ = self.routes.setdefault(route, Route())
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            statistics_.record(time.perf_counter() - start, False)
+            return None
+        statistics_.record(time.perf_counter() - start, response.is_success)
+        return response if response.is_success else None
+
+
+class User:
+    """
+    Virtual user browsing acronyms like the frontend acronym store.
+
+    Searches are typed one key at a time and sent once typing pauses for the
+    debounce period. Pages are then flipped by offset, with cursors from
+    previous pages, as the store does. Some users log in and send their
+    bearer token, and some add, change and remove an acronym.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        report: Report,
+        profile: Profile,
+        terms: List[str],
+        generator: random.Random,
+    ) -> None:
+        """Create user sending requests with a shared client."""
+        self.client = client
+        self.cursors: Dict[int, str] = {}
+        self.generator = generator
+        self.headers: Dict[str, str] = {}
+        self.profile = profile
+        self.report = report
+        self.terms = terms
+
+    async def browse(self) -> None:
+        """Type a search term and flip through its pages."""
+        term = self.generator.choice(self.terms)
+        # Like the store, earlier searches are not cancelled by later ones.
+        pending: Set[asyncio.Task] = set()
+        for index in range(1, len(term) + 1):
+            gap = math.inf
+            if index < len(term):
+                gap = self.generator.expovariate(1 / self.profile.keystroke)
+            if gap < self.profile.debounce:
+                await asyncio.sleep(gap)
+                continue
+
+            await asyncio.sleep(self.profile.debounce)
+            self.cursors.clear()
+            pending.add(asyncio.create_task(self.fetch(term[:index], 0)))
+            if index < len(term):
+                await asyncio.sleep(gap - self.profile.debounce)
+        await asyncio.gather(*pending)
+
+        offset = 0
+        for _ in range(self.generator.randint(0, self.profile.pages)):
+            following = [start for start in self.cursors if start > offset]
+            if not following:
+                break
+            offset = min(following)
+            await self.pause()
+            await self.fetch(term, offset)
+
+    async def edit(self) -> None:
+        """Add, change and remove an acronym of this user."""
+        body = {
+            "abbreviation": "LOAD",
+            "phrase": f"Load Test {secrets.token_hex(8)}",
+        }
+        response = await self.request("POST", "/api/acronym", json=body)
+        if response is None:
+            return
+
+        url = f"/api/acronym/{response.json()}"
+        await self.pause()
+        body["phrase"] += " Edited"
+        await self.request("PUT", "/api/acronym/{id}", url=url, json=body)
+        await self.pause()
+        await self.request("DELETE", "/api/acronym/{id}", url=url)
+
+    async def fetch(self, search: str, offset: int) -> None:
+        """Get a page of acronyms and remember the cursor to the next one."""
+        cursor = self.cursors.get(offset)
+        params: Dict[str, Any] = (
+            {"offset": offset} if cursor is None else {"cursor": cursor}
+        )
+        if search:
+            params.update(abbreviation=search, phrase=search)
+
+        response = await self.request("GET", "/api/acronym", params=params)
+        if response is not None:
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is not None:
+                self.cursors[offset + len(response.json())] = cursor
+
+    async def login(self) -> None:
+        """Register a new account and authenticate with its access token."""
+        email = f"load.{secrets.token_hex(8)}@mail.com"
+        password = secrets.token_urlsafe(16)
+        body = {"email": email, "password": password}
+        if await self.request("POST", "/auth/register", json=body) is None:
+            return
+
+        response = await self.request(
+            "POST",
+            "/auth/login",
+            data={"username": email, "password": password},
+        )
+        if response is not None:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def pause(self) -> None:
+        """Wait for a random think time."""
+        await asyncio.sleep(self.generator.expovariate(1 / self.profile.think))
+
+    async def request(
+        self, method: str, route: str, url: Optional[str] = None, **kwargs: Any
+    ) -> Optional[httpx.Response]:
+        """Send request as this user and record it under method and route."""
+        return await self.report.request(
+            self.client,
+            method,
+            url or route,
+            f"{method} {route}",
+            headers=self.headers,
+            **kwargs,
+        )
+
+    async def run(self, deadline: float) -> None:
+        """Open the site and browse at least once and until deadline."""
+        if self.generator.random() < self.profile.login_rate:
+            await self.login()
+        if self.headers:
+            await self.request("GET", "/users/me")
+        await self.fetch("", 0)
+
+        while True:
+            await self.pause()
+            await self.browse()
+            if self.generator.random() < self.profile.edit_rate:
+                await self.edit()
+            if time.perf_counter() >= deadline:
+                break
+
+
+async def run(url: str, profile: Profile, seed: Optional[int] = None) -> Report:
+    """Simulate users against the server at a base URL."""
+    limits = httpx.Limits(
+        max_connections=profile.users, max_keepalive_connections=profile.users
+    )
+    async with httpx.AsyncClient(
+        base_url=url, limits=limits, timeout=profile.timeout
+    ) as client:
+        return await simulate(client, profile, seed)
+
+
+async def sample(client: httpx.AsyncClient) -> List[str]:
+    """Get abbreviations and phrase words of acronyms to search for."""
+    response = await client.get("/api/acronym", params={"limit": 50})
+    response.raise_for_status()
+    terms = {acronym["abbreviation"] for acronym in response.json()}
+    for acronym in response.json():
+        terms.update(acronym["phrase"].split())
+    return sorted(terms) or list("aeiou")
+
+
+async def simulate(
+    client: httpx.AsyncClient, profile: Profile, seed: Optional[int] = None
+) -> Report:
+    """
+    Run virtual users with a client and collect request statistics.
+
+    Users start evenly spread over the ramp period and repeat browsing
+    sessions until the duration elapses, with at least one session each.
+    """
+    generator = random.Random(seed)
+    terms = await sample(client)
+    report = Report()
+    deadline = report.start + profile.duration
+
+    async def start(index: int, seed_: float) -> None:
+        await asyncio.sleep(profile.ramp * index / profile.users)
+        user = User(client, report, profile, terms, random.Random(seed_))
+        await user.run(deadline)
+
+    await asyncio.gather(
+        *(start(index, generator.random()) for index in range(profile.users))
+    )
+    report.elapsed = time.perf_counter() - report.start
+    return report
@@ -22,6 +22,9 @@ function debounce(callback: Callback, milliseconds = 100): Callback {
 
 export const useAcronymStore = defineStore("acronym", () => {
   const count = ref(0);
+  // Cursors returned by the server, keyed by the offset of the page they
+  // start, so that pages reached sequentially avoid offset scans.
+  const cursors = new Map<number, string>();
   const data = ref<Acronym[]>([]);
   const error = ref({ active: false, message: "" });
   const search = ref("");
@@ -42,7 +45,13 @@ export const useAcronymStore = defineStore("acronym", () => {
       parameters = "";
     }
 
-    const response = await fetch(`/api/acronym?offset=${offset}${parameters}`);
+    const cursor = cursors.get(offset);
+    const position =
+      cursor === undefined
+        ? `offset=${offset}`
+        : `cursor=${encodeURIComponent(cursor)}`;
+
+    const response = await fetch(`/api/acronym?${position}${parameters}`);
     if (!response.ok) {
       console.error(response.text());
       return;
@@ -53,9 +62,17 @@ export const useAcronymStore = defineStore("acronym", () => {
       count.value = parseInt(headerCount);
     }
     data.value = await response.json();
+
+    const nextCursor = response.headers.get("X-Next-Cursor");
+    if (nextCursor !== null) {
+      cursors.set(offset + data.value.length, nextCursor);
+    }
   }
 
-  watch(search, async () => await debounce(fetchData, 500)(0));
+  watch(search, async () => {
+    cursors.clear();
+    await debounce(fetchData, 500)(0);
+  });
 
   return {
     count,
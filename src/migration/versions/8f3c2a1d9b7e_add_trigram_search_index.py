@@ -0,0 +1,43 @@
+"""Add trigram search index
+
+PostgreSQL answers substring filters from pg_trgm GIN indexes. SQLite instead
+searches the FTS5 table acronyms_trigram, which is not managed by migrations.
+Startup creates and fills it in trigram search mode and drops it otherwise,
+see search.initialize_index.
+
+Revision ID: 8f3c2a1d9b7e
+Revises: 46ee6e1569b5
+Create Date: 2026-10-18 09:12:41.508326
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8f3c2a1d9b7e"
+down_revision = "46ee6e1569b5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in ["abbreviation", "phrase"]:
+        op.create_index(
+            f"ix_acronyms_{column}_trigram",
+            "acronyms",
+            [column],
+            postgresql_ops={column: "gin_trgm_ops"},
+            postgresql_using="gin",
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    for column in ["abbreviation", "phrase"]:
+        op.drop_index(f"ix_acronyms_{column}_trigram", table_name="acronyms")
@@ -0,0 +1,33 @@
+"""Add mail outbox
+
+Startup creates missing tables, so the outbox may already exist.
+
+Revision ID: a9d4e6f2b3c1
+Revises: 8f3c2a1d9b7e
+Create Date: 2026-10-18 17:20:44.615207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a9d4e6f2b3c1"
+down_revision = "8f3c2a1d9b7e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("mail_outbox"):
+        op.create_table(
+            "mail_outbox",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("claimed_at", sa.Float(), nullable=True),
+            sa.Column("message", sa.Unicode(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("mail_outbox")
@@ -5,8 +5,11 @@ from argparse import BooleanOptionalAction
 import secrets
 import subprocess
 from typing import Dict, Iterator, Tuple, cast
+from unittest.mock import MagicMock
 
 from _pytest.fixtures import SubRequest
+from aiosmtpd.controller import Controller
+from fakeredis.aioredis import FakeRedis
 from fastapi.testclient import TestClient
 from psycopg import Connection
 import pytest
@@ -14,7 +17,6 @@ from pytest import Parser
 from pytest_mock import MockerFixture
 import schemathesis
 from schemathesis.specs.openapi.schemas import BaseOpenAPISchema
-from sqlalchemy.ext import asyncio
 
 from tests import util
 
@@ -44,19 +46,15 @@ def build(request: SubRequest) -> None:
 
 
 @pytest.fixture
-def client(mocker: MockerFixture) -> Iterator[TestClient]:
-    """Fast API test client."""
-    settings = util.mock_settings()
+def client(request: SubRequest, mocker: MockerFixture) -> Iterator[TestClient]:
+    """
+    Fast API test client.
+
+    Settings overrides can be passed with indirect parametrization.
+    """
+    settings = util.mock_settings(**getattr(request, "param", {}))
     mocker.patch("acronyms.settings.settings", lambda: settings)
-    # TODO: Figure out better method to prevent get_engine from being cached
-    # between test functions.
-    mocker.patch(
-        "acronyms.models.get_engine",
-        lambda: asyncio.create_async_engine(
-            str(settings.database), future=True
-        ),
-    )
-    mocker.patch("redmail.EmailSender.send")
+    mocker.patch("acronyms.mail.Dispatcher.send")
 
     from acronyms.main import app
 
@@ -104,6 +102,14 @@ def pytest_addoption(parser: Parser) -> None:
     )
 
 
+@pytest.fixture
+def redis(mocker: MockerFixture) -> FakeRedis:
+    """In process fake Redis server used as application cache."""
+    redis = FakeRedis()
+    mocker.patch("acronyms.cache.redis_client", return_value=redis)
+    return redis
+
+
 @pytest.fixture
 def server(
     request: SubRequest, mocker: MockerFixture
@@ -128,6 +134,29 @@ def server(
         mail.terminate()
 
 
+@pytest.fixture
+def smtp(client: TestClient, mocker: MockerFixture) -> Iterator[util.Mailbox]:
+    """
+    Local SMTP server at the port of the application settings.
+
+    Email sent by the client application is delivered instead of mocked.
+    """
+    from acronyms import mail, settings
+
+    mocker.stop(cast(MagicMock, mail.Dispatcher.send))
+    mailbox = util.Mailbox()
+    controller = Controller(
+        mailbox,
+        auth_require_tls=False,
+        authenticator=util.authenticate,
+        hostname="localhost",
+        port=settings.settings().smtp_port,
+    )
+    controller.start()
+    yield mailbox
+    controller.stop()
+
+
 @pytest.fixture
 def user(client: TestClient) -> Tuple[str, str]:
     """Create new user in application."""
@@ -1,9 +1,14 @@
 """Tests for acronym routes."""
 
 
+import json
+
 from fastapi.testclient import TestClient
 from httpx import HTTPStatusError
 import pytest
+from pytest_mock import MockerFixture
+
+from acronyms.cache import Change
 
 
 def test_delete_acronym(client: TestClient) -> None:
@@ -131,3 +136,400 @@ def test_put_duplicate(client: TestClient) -> None:
     put_response = client.put("/api/acronym/2", json=body)
     with pytest.raises(HTTPStatusError):
         put_response.raise_for_status()
+
+
+def test_search_substring(client: TestClient) -> None:
+    """Search matches terms in the middle of words."""
+    response = client.get("/api/acronym?phrase=hysical")
+    response.raise_for_status()
+    assert [acronym["phrase"] for acronym in response.json()] == [
+        "Physical Therapist"
+    ]
+
+
+def test_search_after_update(client: TestClient) -> None:
+    """Search reflects updated acronym values."""
+    body = {"abbreviation": "AM", "phrase": "Amplitude Modulation"}
+    response_1 = client.put("/api/acronym/1", json=body)
+    response_1.raise_for_status()
+
+    response_2 = client.get("/api/acronym?phrase=Meridiem")
+    response_2.raise_for_status()
+    assert response_2.json() == []
+
+    response_3 = client.get("/api/acronym?phrase=Modulation")
+    response_3.raise_for_status()
+    assert [acronym["id"] for acronym in response_3.json()] == [1]
+
+
+@pytest.mark.parametrize("client", [{"search_typo_index": True}], indirect=True)
+def test_search_fuzzy(client: TestClient) -> None:
+    """Fuzzy search matches mistyped abbreviations and follows writes."""
+    url = "/api/acronym?abbreviation=GIU&fuzzy=true"
+    response_1 = client.get(url)
+    response_1.raise_for_status()
+    assert [acronym["abbreviation"] for acronym in response_1.json()] == ["GUI"]
+    response_2 = client.get("/api/acronym?abbreviation=GIU")
+    assert response_2.json() == []
+
+    acronym = {"abbreviation": "GIT", "phrase": "Global Information Tracker"}
+    client.post("/api/acronym", json=acronym).raise_for_status()
+    response_3 = client.get(url)
+    response_3.raise_for_status()
+    assert [acronym["abbreviation"] for acronym in response_3.json()] == [
+        "GUI",
+        "GIT",
+    ]
+
+
+def test_search_fuzzy_disabled(client: TestClient) -> None:
+    """Fuzzy search is rejected while the typo index is disabled."""
+    response = client.get("/api/acronym?abbreviation=GIU&fuzzy=true")
+    assert response.status_code == 400
+
+
+def test_search_trigram(client: TestClient) -> None:
+    """Trigram search matches substrings across words and tracks deletes."""
+    for phrase in ["TE meri", "an_e"]:
+        response_1 = client.get("/api/acronym", params={"phrase": phrase})
+        response_1.raise_for_status()
+        assert [acronym["id"] for acronym in response_1.json()] == [1]
+
+    client.delete("/api/acronym/1").raise_for_status()
+    response_2 = client.get("/api/acronym?phrase=te%20meri")
+    response_2.raise_for_status()
+    assert response_2.json() == []
+
+
+@pytest.mark.parametrize("client", [{"search": "fts"}], indirect=True)
+def test_search_fts(client: TestClient) -> None:
+    """Full text search matches word prefixes and tracks updates."""
+    response_1 = client.get("/api/acronym?phrase=phys")
+    response_1.raise_for_status()
+    assert [acronym["id"] for acronym in response_1.json()] == [15]
+
+    body = {"abbreviation": "PT", "phrase": "Personal Trainer"}
+    response_2 = client.put("/api/acronym/15", json=body)
+    response_2.raise_for_status()
+
+    response_3 = client.get("/api/acronym?phrase=phys")
+    response_3.raise_for_status()
+    assert response_3.json() == []
+
+    response_4 = client.get("/api/acronym?phrase=pers tra")
+    response_4.raise_for_status()
+    assert [acronym["id"] for acronym in response_4.json()] == [15]
+
+
+def test_get_pagination_cursor(client: TestClient) -> None:
+    """Cursor pages continue where the previous page ended."""
+    response_1 = client.get("/api/acronym?order=phrase&limit=5")
+    response_1.raise_for_status()
+    cursor = response_1.headers["X-Next-Cursor"]
+
+    response_2 = client.get(
+        "/api/acronym", params={"order": "phrase", "cursor": cursor}
+    )
+    response_2.raise_for_status()
+    response_3 = client.get("/api/acronym?order=phrase&offset=5")
+    response_3.raise_for_status()
+    assert response_2.json() == response_3.json()
+
+
+def test_get_pagination_cursor_end(client: TestClient) -> None:
+    """Last page has no next cursor."""
+    response = client.get("/api/acronym?offset=10")
+    response.raise_for_status()
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_pagination_cursor_order(client: TestClient) -> None:
+    """Cursors are rejected for listings of another order."""
+    response_1 = client.get("/api/acronym?limit=5")
+    response_1.raise_for_status()
+    cursor = response_1.headers["X-Next-Cursor"]
+
+    response_2 = client.get(
+        "/api/acronym", params={"order": "phrase", "cursor": cursor}
+    )
+    assert response_2.status_code == 400
+    response_3 = client.get(
+        "/api/acronym", params={"order": "id", "cursor": cursor}
+    )
+    response_3.raise_for_status()
+
+
+def test_get_pagination_cursor_error(client: TestClient) -> None:
+    """Malformed cursors are rejected."""
+    response = client.get("/api/acronym?cursor=invalid")
+    assert response.status_code == 400
+
+
+def test_get_total_count(client: TestClient) -> None:
+    """Exact totals are returned with the page."""
+    response = client.get("/api/acronym?phrase=Time")
+    response.raise_for_status()
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.headers["X-Total-Count-Mode"] == "exact"
+
+
+def test_get_total_count_empty_page(client: TestClient) -> None:
+    """Pages past the end still report the total."""
+    response = client.get("/api/acronym?offset=100")
+    response.raise_for_status()
+    assert response.json() == []
+    assert response.headers["X-Total-Count"] == "16"
+
+
+@pytest.mark.parametrize("client", [{"count_limit": 5}], indirect=True)
+def test_get_total_count_capped(client: TestClient) -> None:
+    """Approximate totals stop counting at the count limit."""
+    response_1 = client.get("/api/acronym?total=approximate")
+    response_1.raise_for_status()
+    assert response_1.headers["X-Total-Count"] == "5+"
+    assert response_1.headers["X-Total-Count-Mode"] == "capped"
+
+    response_2 = client.get("/api/acronym?total=approximate&phrase=Time")
+    response_2.raise_for_status()
+    assert response_2.headers["X-Total-Count"] == "2"
+    assert response_2.headers["X-Total-Count-Mode"] == "exact"
+
+
+def test_post_acronyms_batch(client: TestClient) -> None:
+    """Batch applies operations in order with a result for each."""
+    operations = [
+        {"action": "delete", "id": 3},
+        {
+            "action": "insert",
+            "acronym": {"abbreviation": "DM", "phrase": "Data Mining"},
+        },
+        {
+            "action": "insert",
+            "acronym": {"abbreviation": "AM", "phrase": "Ante Meridiem"},
+        },
+        {
+            "action": "update",
+            "acronym": {"abbreviation": "AM", "phrase": "Amplitude Modulation"},
+            "id": 1,
+        },
+        {"action": "delete", "id": 10000},
+    ]
+    response_1 = client.post("/api/acronyms/batch", json=operations)
+    response_1.raise_for_status()
+    results = response_1.json()
+    assert [result["status"] for result in results] == [
+        "ok",
+        "ok",
+        "conflict",
+        "ok",
+        "not_found",
+    ]
+
+    response_2 = client.get("/api/acronym?phrase=Data Mining")
+    response_2.raise_for_status()
+    assert [acronym["id"] for acronym in response_2.json()] == [
+        results[1]["id"]
+    ]
+
+    response_3 = client.get("/api/acronym?phrase=Modulation")
+    response_3.raise_for_status()
+    assert [acronym["id"] for acronym in response_3.json()] == [1]
+
+
+def test_post_acronyms_batch_removed(
+    client: TestClient, mocker: MockerFixture
+) -> None:
+    """Batch conflicts when planned acronyms are removed before the write."""
+    mocker.patch(
+        "acronyms.batch.load",
+        return_value={999: Change(999, "GONE", "Removed Acronym")},
+    )
+    operations = [
+        {
+            "action": "update",
+            "acronym": {"abbreviation": "NEW", "phrase": "New Acronym"},
+            "id": 999,
+        }
+    ]
+    response = client.post("/api/acronyms/batch", json=operations)
+    assert response.status_code == 409
+
+
+def test_post_acronyms_batch_swap(client: TestClient) -> None:
+    """Batch updates may take values that earlier rows give up."""
+    first = client.get("/api/acronym?id=1").json()
+    second = client.get("/api/acronym?id=2").json()
+    operations = [
+        {
+            "action": "update",
+            "acronym": {"abbreviation": "X", "phrase": "Placeholder"},
+            "id": 1,
+        },
+        {
+            "action": "update",
+            "acronym": {
+                "abbreviation": first["abbreviation"],
+                "phrase": first["phrase"],
+            },
+            "id": 2,
+        },
+        {
+            "action": "update",
+            "acronym": {
+                "abbreviation": second["abbreviation"],
+                "phrase": second["phrase"],
+            },
+            "id": 1,
+        },
+    ]
+    response = client.post("/api/acronyms/batch", json=operations)
+    response.raise_for_status()
+    assert [result["status"] for result in response.json()] == ["ok"] * 3
+
+    assert client.get("/api/acronym?id=1").json()["phrase"] == second["phrase"]
+    assert client.get("/api/acronym?id=2").json()["phrase"] == first["phrase"]
+
+
+def test_get_acronyms_export_csv(client: TestClient) -> None:
+    """Export streams matching acronyms as CSV."""
+    response = client.get("/api/acronyms/export?phrase=data&format=csv")
+    response.raise_for_status()
+    assert response.headers["Content-Type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "id,abbreviation,description,phrase",
+        "3,DM,,Data Mining",
+    ]
+
+
+def test_get_acronyms_export_ndjson(client: TestClient) -> None:
+    """Export streams every acronym as NDJSON in id order."""
+    response = client.get("/api/acronyms/export")
+    response.raise_for_status()
+    acronyms = [json.loads(line) for line in response.text.splitlines()]
+    assert [acronym["id"] for acronym in acronyms] == list(range(1, 17))
+    assert acronyms[0] == {
+        "abbreviation": "AM",
+        "description": None,
+        "id": 1,
+        "phrase": "Ante Meridiem",
+    }
+
+
+def test_get_acronyms_lookup(client: TestClient) -> None:
+    """Batch lookup groups acronyms by identifier and exact abbreviation."""
+    url = "/api/acronyms/lookup?abbreviation=DM&abbreviation=D&id=1&id=10000"
+    response_1 = client.get(url)
+    response_1.raise_for_status()
+    body = response_1.json()
+    assert [acronym["phrase"] for acronym in body["abbreviations"]["DM"]] == [
+        "Data Mining",
+        "Direct Message",
+    ]
+    assert body["abbreviations"]["D"] == []
+    assert body["ids"]["1"]["abbreviation"] == "AM"
+    assert body["ids"]["10000"] is None
+
+    acronym = {"abbreviation": "DM", "phrase": "Dungeon Master"}
+    client.post("/api/acronym", json=acronym).raise_for_status()
+    response_2 = client.get(url)
+    response_2.raise_for_status()
+    assert len(response_2.json()["abbreviations"]["DM"]) == 3
+    assert response_2.json()["ids"] == body["ids"]
+
+    response_3 = client.get("/api/stats/cache/routes")
+    counter = response_3.json()["get_acronyms_lookup"]
+    assert (counter["hits"], counter["misses"]) == (2, 6)
+
+
+def test_get_acronym_search_disabled(client: TestClient) -> None:
+    """Ranked search is missing while the word index is disabled."""
+    response = client.get("/api/acronym/search?query=rip")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("client", [{"search_word_index": True}], indirect=True)
+def test_get_acronym_search(client: TestClient) -> None:
+    """Search ranks abbreviation hits first and then phrase matches."""
+    acronym = {"abbreviation": "RIPE", "phrase": "Research In Peace Envoy"}
+    client.post("/api/acronym", json=acronym).raise_for_status()
+
+    response = client.get("/api/acronym/search?query=rip")
+    response.raise_for_status()
+    assert [acronym["abbreviation"] for acronym in response.json()] == [
+        "RIP",
+        "RIPE",
+    ]
+    response = client.get("/api/acronym/search?query=in%20peace&limit=1")
+    assert [acronym["phrase"] for acronym in response.json()] == [
+        "Rest In Peace"
+    ]
+    response = client.get("/api/acronym/search?query=in%20peace&offset=1")
+    assert [acronym["phrase"] for acronym in response.json()] == [
+        "Research In Peace Envoy"
+    ]
+    response = client.get("/api/acronym/search?query=nursing%20mining")
+    assert response.json() == []
+
+
+@pytest.mark.parametrize("client", [{"search_word_index": True}], indirect=True)
+def test_get_acronym_search_writes(client: TestClient) -> None:
+    """Search follows descriptions of updated acronyms."""
+    url = "/api/acronym/search?query=mining%20documents"
+    assert client.get(url).json() == []
+
+    acronym = {
+        "abbreviation": "TM",
+        "description": "Mining of patterns in documents",
+        "phrase": "Text Mining",
+    }
+    response = client.post(
+        "/api/acronyms/batch", json=[{"acronym": acronym, "action": "insert"}]
+    )
+    response.raise_for_status()
+    id_ = response.json()[0]["id"]
+    assert client.get(url).json() == [{"id": id_, **acronym}]
+
+    acronym["description"] = "Mining of patterns in text"
+    client.put(f"/api/acronym/{id_}", json=acronym).raise_for_status()
+    assert client.get(url).json() == []
+
+
+def test_get_acronym_suggest(client: TestClient) -> None:
+    """Suggestions complete abbreviations and the words of phrases."""
+    response = client.get("/api/acronym/suggest?prefix=N&limit=3")
+    response.raise_for_status()
+    assert response.json() == {
+        "abbreviations": ["NA", "NH"],
+        "phrases": [
+            "New Hampshire",
+            "Not Applicable",
+            "JavaScript Object Notation",
+        ],
+    }
+
+
+def test_get_acronym_suggest_writes(client: TestClient) -> None:
+    """Suggestions follow inserted, updated and deleted acronyms."""
+    url = "/api/acronym/suggest?prefix=dun"
+    acronym = {"abbreviation": "DUN", "phrase": "Dungeon Master"}
+    response = client.post("/api/acronym", json=acronym)
+    response.raise_for_status()
+    id_ = response.json()
+    assert client.get(url).json() == {
+        "abbreviations": ["DUN"],
+        "phrases": ["Dungeon Master"],
+    }
+
+    acronym = {"abbreviation": "DM", "phrase": "Dungeon Master"}
+    client.put(f"/api/acronym/{id_}", json=acronym).raise_for_status()
+    assert client.get(url).json() == {
+        "abbreviations": [],
+        "phrases": ["Dungeon Master"],
+    }
+    response = client.get("/api/acronym/suggest?prefix=dm")
+    assert response.json()["abbreviations"] == ["DM"]
+
+    client.delete(f"/api/acronym/{id_}").raise_for_status()
+    assert client.get(url).json() == {"abbreviations": [], "phrases": []}
+    response = client.get("/api/acronym/suggest?prefix=dm")
+    assert response.json()["abbreviations"] == ["DM"]
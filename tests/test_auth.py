@@ -7,6 +7,8 @@ from typing import Tuple
 from fastapi.testclient import TestClient
 from pytest_mock import MockerFixture
 
+from acronyms import models
+
 
 def test_login(
     client: TestClient, user: Tuple[str, str], mocker: MockerFixture
@@ -40,7 +42,7 @@ def test_profile(
 
 def test_register(client: TestClient, mocker: MockerFixture) -> None:
     """New regular user is able to register."""
-    mocker.patch("redmail.EmailSender.send")
+    mocker.patch("acronyms.mail.Dispatcher.send")
 
     password = secrets.token_urlsafe(16)
     body = {"email": "basic.user@mail.com", "password": password}
@@ -50,3 +52,47 @@ def test_register(client: TestClient, mocker: MockerFixture) -> None:
 
     assert result["is_active"]
     assert not result["is_superuser"]
+
+
+def test_profile_cached(
+    client: TestClient, access_token: str, mocker: MockerFixture
+) -> None:
+    """Repeated requests with an access token skip the token database."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    client.get("/users/me", headers=headers).raise_for_status()
+    get_by_token = mocker.spy(
+        models.SQLAlchemyAccessTokenDatabase, "get_by_token"
+    )
+
+    response = client.get("/users/me", headers=headers)
+    response.raise_for_status()
+
+    assert response.json()["email"] == "basic.user@mail.com"
+    get_by_token.assert_not_called()
+
+
+def test_profile_logout(
+    client: TestClient, access_token: str, mocker: MockerFixture
+) -> None:
+    """Cached access tokens are rejected after logout."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    client.get("/users/me", headers=headers).raise_for_status()
+    client.post("/auth/logout", headers=headers).raise_for_status()
+
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 401
+
+
+def test_profile_update(
+    client: TestClient, access_token: str, mocker: MockerFixture
+) -> None:
+    """Cached users are refreshed after updates."""
+    headers = {"Authorization": f"Bearer {access_token}"}
+    client.get("/users/me", headers=headers).raise_for_status()
+    client.patch(
+        "/users/me", headers=headers, json={"email": "new.user@mail.com"}
+    ).raise_for_status()
+
+    response = client.get("/users/me", headers=headers)
+    response.raise_for_status()
+    assert response.json()["email"] == "new.user@mail.com"
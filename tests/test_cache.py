@@ -0,0 +1,318 @@
+"""Tests for response caching."""
+
+
+import asyncio
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi.testclient import TestClient
+from fastapi_cache.backends.redis import RedisBackend
+import pytest
+from pytest_mock import MockerFixture
+
+from acronyms import cache
+from acronyms.cache import Change, Dependencies
+from tests import util
+
+
+def test_affected_by_contained_id() -> None:
+    """Writes to an acronym in a response affect it."""
+    dependencies = Dependencies(ids={1})
+    assert dependencies.affected_by(Change(1, "AM", "Ante Meridiem"))
+    assert not dependencies.affected_by(Change(2, "AM", "Ante Meridiem"))
+
+
+def test_affected_by_filter() -> None:
+    """Writes to acronyms matching a listing filter affect it."""
+    dependencies = Dependencies(listing=True, phrase="data min")
+    assert dependencies.affected_by(Change(3, "DM", "Data Mining"))
+    assert not dependencies.affected_by(Change(4, "DM", "Direct Message"))
+
+
+def test_affected_by_fuzzy() -> None:
+    """Fuzzy listings are affected by abbreviations within their distance."""
+    dependencies = Dependencies(abbreviation="giu", distance=1, listing=True)
+    assert dependencies.affected_by(Change(5, "GUI", "Graphical Interface"))
+    assert not dependencies.affected_by(Change(6, "CLI", "Command Line"))
+
+
+def test_affected_by_unfiltered() -> None:
+    """Every write affects unfiltered listings."""
+    dependencies = Dependencies(listing=True)
+    assert dependencies.affected_by(Change(4, "DM", "Direct Message"))
+
+
+def test_dependencies_buckets() -> None:
+    """Listings are indexed under characters every affecting write has."""
+    assert Dependencies(ids={1, 2}).buckets() == {"id:1", "id:2"}
+    assert Dependencies(listing=True).buckets() == {"all"}
+    dependencies = Dependencies(
+        abbreviation="gu", listing=True, phrase="-ui Design"
+    )
+    assert dependencies.buckets() == {"gram:gu", "gram:des"}
+    dependencies = Dependencies(abbreviation="GIU", distance=1, listing=True)
+    assert dependencies.buckets() == {"gram:g", "gram:i", "gram:u"}
+    dependencies = Dependencies(abbreviation="G", distance=1, listing=True)
+    assert dependencies.buckets() == {"all"}
+    assert Dependencies(listing=True, phrase="d%").buckets() == {"all"}
+
+
+def test_registry_pop_affected() -> None:
+    """Registry only evicts affected entries."""
+    registry = cache.MemoryRegistry()
+    asyncio.run(
+        registry.register("data", Dependencies(listing=True, phrase="Data"), 60)
+    )
+    asyncio.run(
+        registry.register("time", Dependencies(listing=True, phrase="Time"), 60)
+    )
+
+    keys = asyncio.run(registry.pop_affected([Change(3, "DM", "Data Mining")]))
+    assert keys == ["data"]
+    assert list(registry.entries) == ["time"]
+
+
+def test_registry_pop_affected_indexed(mocker: MockerFixture) -> None:
+    """Writes only check entries indexed under their id or characters."""
+    registry = cache.MemoryRegistry()
+    asyncio.run(
+        registry.register("data", Dependencies(listing=True, phrase="Data"), 60)
+    )
+    asyncio.run(registry.register("ids", Dependencies(ids={4}), 60))
+    affected_by = mocker.spy(Dependencies, "affected_by")
+
+    keys = asyncio.run(registry.pop_affected([Change(9, "XY", "Xylophone")]))
+    assert keys == []
+    affected_by.assert_not_called()
+
+    keys = asyncio.run(registry.pop_affected([Change(4, "XY", "Xylophone")]))
+    assert keys == ["ids"]
+    assert list(registry.entries) == ["data"]
+    assert set(registry.buckets) == {"gram:dat"}
+
+
+def test_redis_registry_shared() -> None:
+    """Writes on one replica evict entries registered by another."""
+
+    async def run() -> None:
+        server = FakeServer()
+        replica_1 = cache.RedisRegistry(FakeRedis(server=server), "registry")
+        replica_2 = cache.RedisRegistry(FakeRedis(server=server), "registry")
+
+        dependencies = Dependencies(listing=True, phrase="Data")
+        await replica_1.register("data", dependencies, 60)
+        await replica_1.register("ids", Dependencies(ids={4}), 60)
+
+        change = Change(3, "DM", "Data Mining")
+        assert await replica_2.pop_affected([change]) == ["data"]
+        assert await replica_1.pop_affected([change]) == []
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("client", [{"cache": "redis"}], indirect=True)
+def test_redis_backend(redis: FakeRedis, client: TestClient) -> None:
+    """Acronym reads are cached in Redis and evicted by writes."""
+    response_1 = client.get("/api/acronym?phrase=Time")
+    response_1.raise_for_status()
+    pattern = "fastapi-cache:registry:entry:*"
+    registry = util.portal(client).call(redis.keys, pattern)
+    assert len(registry) == 1
+
+    response_2 = client.put(
+        "/api/acronym/5", json={"abbreviation": "FT", "phrase": "Foot"}
+    )
+    response_2.raise_for_status()
+    registry = util.portal(client).call(redis.keys, pattern)
+    assert registry == []
+
+    response_3 = client.get("/api/stats/cache")
+    response_3.raise_for_status()
+    assert set(response_3.json()) == {"local", "shared"}
+
+
+def test_tiered_backend() -> None:
+    """Local tier answers repeated reads and is evicted by other replicas."""
+
+    async def run() -> None:
+        server = FakeServer()
+        replicas = []
+        for _ in range(2):
+            redis = FakeRedis(server=server)
+            local = cache.MemoryBackend(10, 2**20)
+            shared = RedisBackend(redis)
+            replicas.append(
+                cache.TieredBackend(local, shared, redis, "channel")
+            )
+            replicas[-1].start()
+        # Gives listeners time to subscribe.
+        await asyncio.sleep(0.1)
+
+        await replicas[0].set("key", "value", 60)
+        assert await replicas[1].get("key") == "value"
+        assert await replicas[1].get("key") == "value"
+        assert replicas[1].stats()["local"].hits == 1
+        assert replicas[1].stats()["shared"].hits == 1
+
+        await replicas[0].clear(key="key")
+        await asyncio.sleep(0.1)
+        assert "key" not in replicas[1].local.entries
+        assert await replicas[1].get("key") is None
+
+        await replicas[0].set("other", "value", 60)
+        assert await replicas[1].get("other") == "value"
+        await cache.clear_keys(replicas[0], ["other"])
+        await asyncio.sleep(0.1)
+        assert "other" not in replicas[1].local.entries
+        assert await replicas[1].get("other") is None
+
+        for replica in replicas:
+            await replica.stop()
+
+    asyncio.run(run())
+
+
+def test_tiered_backend_reconnect(mocker: MockerFixture) -> None:
+    """Listeners resubscribe after failures and empty the local tier."""
+
+    async def run() -> None:
+        redis = FakeRedis(server=FakeServer())
+        local = cache.MemoryBackend(10, 2**20)
+        backend = cache.TieredBackend(
+            local, RedisBackend(redis), redis, "channel", backoff=0.01
+        )
+        await backend.set("key", "value", 60)
+        mocker.patch.object(
+            redis,
+            "pubsub",
+            side_effect=[ConnectionError("lost"), redis.pubsub()],
+        )
+
+        backend.start()
+        await asyncio.sleep(0.1)
+        assert local.entries == {}
+
+        await local.set("other", "value", 60)
+        await redis.publish("channel", '{"keys": ["other"]}')
+        await asyncio.sleep(0.1)
+        assert local.entries == {}
+        await backend.stop()
+
+    asyncio.run(run())
+
+
+def test_memory_backend_lru() -> None:
+    """Memory backend evicts least recently used entries."""
+
+    async def run() -> None:
+        backend = cache.MemoryBackend(2, 2**20)
+        await backend.set("a", "1", 60)
+        await backend.set("b", "2", 60)
+        assert await backend.get("a") == "1"
+        await backend.set("c", "3", 60)
+        assert list(backend.entries) == ["a", "c"]
+        assert await backend.get("b") is None
+
+        counter = backend.stats()["memory"]
+        assert (counter.evictions, counter.hits, counter.misses) == (1, 1, 1)
+
+    asyncio.run(run())
+
+
+def test_memory_backend_memory_budget() -> None:
+    """Memory backend evicts entries once its memory budget is exceeded."""
+
+    async def run() -> None:
+        value = "x" * 1000
+        backend = cache.MemoryBackend(100, 3000)
+        for key in "abcd":
+            await backend.set(key, value, 60)
+        assert list(backend.entries) == ["c", "d"]
+        assert backend.memory <= 3000
+
+        assert await backend.clear(namespace="c") == 1
+        assert list(backend.entries) == ["d"]
+
+    asyncio.run(run())
+
+
+def test_memory_backend_removes_registrations() -> None:
+    """Registrations are dropped along with evicted or cleared entries."""
+
+    async def run() -> None:
+        registry = cache.MemoryRegistry()
+        backend = cache.MemoryBackend(2, 2**20, registry.discard)
+        for key in "abc":
+            await registry.register(key, Dependencies(ids={1}), 60)
+            await backend.set(key, "1", 60)
+        assert list(registry.entries) == ["b", "c"]
+
+        await backend.clear(key="b")
+        assert list(registry.entries) == ["c"]
+        assert registry.buckets == {"id:1": {"c"}}
+
+    asyncio.run(run())
+
+
+def test_cache_key_normalized(client: TestClient) -> None:
+    """Equivalent listings share a cache entry including its headers."""
+    response_1 = client.get("/api/acronym?phrase=Physical")
+    response_1.raise_for_status()
+    response_2 = client.get("/api/acronym?phrase=%20physical%20")
+    response_2.raise_for_status()
+
+    assert response_2.json() == response_1.json()
+    assert response_2.headers["X-Total-Count"] == "1"
+    assert response_2.headers["X-Total-Count-Mode"] == "exact"
+    assert response_2.headers["ETag"] == response_1.headers["ETag"]
+
+    response_3 = client.get("/api/stats/cache/routes")
+    response_3.raise_for_status()
+    counter = response_3.json()["get_acronym"]
+    assert (counter["hits"], counter["misses"]) == (1, 1)
+    assert counter["hit_ratio"] == 0.5
+
+
+@pytest.mark.parametrize(
+    "client", [{"cache": "memory"}, {"cache": "redis"}], indirect=True
+)
+def test_conditional_get(redis: FakeRedis, client: TestClient) -> None:
+    """Unchanged acronyms are answered with 304 until the next write."""
+    response_1 = client.get("/api/acronym?id=1")
+    response_1.raise_for_status()
+    etag = response_1.headers["ETag"]
+    assert "must-revalidate" in response_1.headers["Cache-Control"]
+
+    response_2 = client.get(
+        "/api/acronym?phrase=data", headers={"If-None-Match": etag}
+    )
+    assert response_2.status_code == 304
+    assert response_2.headers["ETag"] == etag
+
+    body = {"abbreviation": "AM", "phrase": "Amplitude Modulation"}
+    client.put("/api/acronym/1", json=body).raise_for_status()
+
+    response_3 = client.get(
+        "/api/acronym?id=1", headers={"If-None-Match": etag}
+    )
+    assert response_3.status_code == 200
+    assert response_3.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("client", [{"cache": "redis"}], indirect=True)
+def test_conditional_get_stale_entry(
+    redis: FakeRedis, client: TestClient
+) -> None:
+    """Entries cached before a version bump keep their older ETag."""
+    response_1 = client.get("/api/acronym?id=1")
+    response_1.raise_for_status()
+    response_2 = client.get("/api/acronyms/lookup?id=1")
+    response_2.raise_for_status()
+    util.portal(client).call(cache.registry().bump_version)
+
+    response_3 = client.get("/api/acronym?id=1")
+    assert response_3.headers["ETag"] == response_1.headers["ETag"]
+    response_4 = client.get("/api/acronyms/lookup?id=1&id=2")
+    assert response_4.headers["ETag"] == response_2.headers["ETag"]
+    response_5 = client.get("/api/acronym?id=2")
+    assert response_5.headers["ETag"] != response_1.headers["ETag"]
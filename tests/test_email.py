@@ -1,12 +1,110 @@
 """Tests for email integration."""
 
 
+from email.message import EmailMessage
+import time
 from typing import Dict
 
+from fastapi.testclient import TestClient
 from playwright.sync_api import Page, expect
 import pytest
+from pytest_mock import MockerFixture
 
 from acronyms import mail
+from acronyms.mail import Dispatcher
+from tests import util
+
+
+def message(subject: str) -> EmailMessage:
+    """Create test email."""
+    return mail.sender().get_message(
+        subject=subject,
+        sender="sender@mail.com",
+        receivers=["reciever@mail.com"],
+        text="This email was sent by the test suite.",
+    )
+
+
+@pytest.mark.parametrize("client", [{"smtp_claim_timeout": 0}], indirect=True)
+def test_dispatcher_outbox(client: TestClient, smtp: util.Mailbox) -> None:
+    """Messages stored in the outbox are delivered after a restart."""
+    portal = util.portal(client)
+    portal.call(mail.store, message("Stored Email"))
+
+    dispatcher = Dispatcher(concurrency=1, retries=0, backoff=0, outbox=True)
+    portal.call(dispatcher.start)
+    portal.call(dispatcher.stop)
+
+    assert len(smtp.envelopes) == 1
+    assert portal.call(mail.pending) == []
+
+
+def test_dispatcher_outbox_claimed(
+    client: TestClient, smtp: util.Mailbox
+) -> None:
+    """Messages claimed by another dispatcher are not sent again."""
+    portal = util.portal(client)
+    portal.call(mail.store, message("Claimed Email"))
+
+    dispatcher = Dispatcher(concurrency=1, retries=0, backoff=0, outbox=True)
+    portal.call(dispatcher.start)
+    portal.call(dispatcher.stop)
+
+    assert smtp.envelopes == []
+
+
+def test_dispatcher_outbox_error(
+    client: TestClient, smtp: util.Mailbox, mocker: MockerFixture
+) -> None:
+    """Workers keep sending after failing to update the outbox."""
+    mocker.patch("acronyms.mail.remove", side_effect=[OSError, None])
+    dispatcher = Dispatcher(concurrency=1, retries=0, backoff=0, outbox=True)
+    portal = util.portal(client)
+    portal.call(dispatcher.start)
+    for index in range(2):
+        portal.call(dispatcher.send, message(f"Email {index}"))
+    portal.call(dispatcher.stop)
+
+    assert len(smtp.envelopes) == 2
+
+
+def test_dispatcher_retry(client: TestClient, smtp: util.Mailbox) -> None:
+    """Temporary delivery failures are retried."""
+    smtp.failures = 2
+    dispatcher = Dispatcher(concurrency=1, retries=2, backoff=0, outbox=False)
+    portal = util.portal(client)
+    portal.call(dispatcher.start)
+    portal.call(dispatcher.send, message("Retried Email"))
+    portal.call(dispatcher.stop)
+
+    assert len(smtp.envelopes) == 1
+
+
+def test_dispatcher_reuse(client: TestClient, smtp: util.Mailbox) -> None:
+    """Queued messages share one SMTP connection per worker."""
+    dispatcher = Dispatcher(concurrency=1, retries=0, backoff=0, outbox=False)
+    portal = util.portal(client)
+    portal.call(dispatcher.start)
+    for index in range(5):
+        portal.call(dispatcher.send, message(f"Email {index}"))
+    portal.call(dispatcher.stop)
+
+    assert len(smtp.envelopes) == 5
+    assert len(smtp.sessions) == 1
+
+
+def test_register_email(client: TestClient, smtp: util.Mailbox) -> None:
+    """Registration responds before its welcome email is delivered."""
+    response = client.post(
+        "/auth/register",
+        json={"email": "register.user@mail.com", "password": "password123"},
+    )
+    response.raise_for_status()
+
+    deadline = time.monotonic() + 5
+    while not smtp.envelopes and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert smtp.envelopes[0].rcpt_tos == ["register.user@mail.com"]
 
 
 @pytest.mark.e2e
@@ -0,0 +1,51 @@
+"""Tests for typo tolerant abbreviation matching."""
+
+
+from pytest_mock import MockerFixture
+
+from acronyms import fuzzy
+from acronyms.fuzzy import DeleteIndex
+
+
+def test_delete_index() -> None:
+    """Words within the edit distance are found regardless of case."""
+    index = DeleteIndex(distance=1)
+    for text in ["GUI", "gui", "CLI", "GUIS", "NASA"]:
+        index.add(text)
+
+    assert index.search("GIU", 1) == ["GUI", "gui"]
+    assert index.search("gu", 1) == ["GUI", "gui"]
+    assert index.search("GUIS", 1) == ["GUI", "GUIS", "gui"]
+    assert index.search("GIU", 0) == []
+
+
+def test_delete_index_long_term(mocker: MockerFixture) -> None:
+    """Terms too long to match any word skip delete generation."""
+    index = DeleteIndex(distance=1)
+    index.add("NASA")
+    deletes = mocker.spy(fuzzy, "deletes")
+
+    assert index.search("NASAS", 1) == ["NASA"]
+    assert index.search("N" * 8000, 1) == []
+    assert deletes.call_count == 1
+
+
+def test_delete_index_remove() -> None:
+    """Removed words are no longer found and leave no deletes behind."""
+    index = DeleteIndex(distance=1)
+    index.add("GUI")
+    index.add("GUI")
+    index.remove("GUI")
+    assert index.search("GIU", 1) == ["GUI"]
+
+    index.remove("GUI")
+    assert index.search("GIU", 1) == []
+    assert index.deletes == {}
+
+
+def test_osa_distance() -> None:
+    """Adjacent transpositions count as a single edit."""
+    assert fuzzy.osa_distance("giu", "gui", 1) == 1
+    assert fuzzy.osa_distance("ca", "abc", 3) == 3
+    assert fuzzy.osa_distance("gui", "cli", 1) == 2
+    assert fuzzy.osa_distance("kitten", "sitting", 3) == 3
@@ -0,0 +1,85 @@
+"""Tests for in memory search indexes."""
+
+
+import asyncio
+
+from fakeredis.aioredis import FakeRedis
+from fastapi.testclient import TestClient
+import pytest
+from pytest_mock import MockerFixture
+
+from acronyms import cache, indexes, models
+from acronyms.indexes import Indexes
+from tests import util
+
+
+@pytest.mark.parametrize(
+    "client", [{"database_sqlite_tuning": True}], indirect=True
+)
+def test_initialize_writer_busy(client: TestClient) -> None:
+    """Indexes are rebuilt while the writer connection is in use."""
+
+    async def run() -> None:
+        async with models.get_engine().connect():
+            await asyncio.wait_for(indexes.initialize(), 5)
+
+    util.portal(client).call(run)
+    assert indexes.indexes().suggest("a", 10)["abbreviations"] != []
+
+
+def test_indexes_replay() -> None:
+    """Writes applied during a rebuild are replayed on the new indexes."""
+    indexes_ = Indexes(distance=1)
+    indexes_.replay = []
+    indexes_.apply({2: ("ML", "Machine Learning", None)})
+    indexes_.replace(
+        indexes.build([(1, "AM", "Ante Meridiem", None)], distance=1)
+    )
+
+    assert indexes_.suggest("m", 10) == {
+        "abbreviations": ["ML"],
+        "phrases": ["Machine Learning", "Ante Meridiem"],
+    }
+    assert indexes_.typos is not None
+    assert indexes_.typos.search("MA", 1) == ["AM", "ML"]
+    assert indexes_.rank("learning", 10) == [2]
+
+
+def test_indexes_update() -> None:
+    """Updated acronyms leave the indexes under their previous values."""
+    indexes_ = indexes.build(
+        [(1, "GUI", "Graphical User Interface", "Windows and icons")], 1
+    )
+    indexes_.built = 0
+    indexes_.apply({1: ("GPS", "Global Positioning System", None)})
+
+    assert indexes_.typos is not None
+    assert indexes_.typos.search("GIU", 1) == []
+    assert indexes_.typos.search("GSP", 1) == ["GPS"]
+    assert indexes_.suggest("g", 10)["phrases"] == ["Global Positioning System"]
+    assert indexes_.rank("icons", 10) == []
+    assert indexes_.rank("gp", 10) == [1]
+
+
+@pytest.mark.parametrize("client", [{"cache": "redis"}], indirect=True)
+def test_refresh_data_version(
+    redis: FakeRedis, client: TestClient, mocker: MockerFixture
+) -> None:
+    """Indexes are only rebuilt once the shared data version changes."""
+    portal = util.portal(client)
+    portal.call(indexes.refresh)
+    build = mocker.spy(indexes, "build")
+    portal.call(indexes.refresh)
+    build.assert_not_called()
+
+    portal.call(cache.registry().bump_version)
+    portal.call(indexes.refresh)
+    build.assert_called_once()
+    assert indexes.indexes().version == portal.call(cache.registry().version)
+
+
+def test_refresh_memory(client: TestClient, mocker: MockerFixture) -> None:
+    """Indexes are always rebuilt without a shared data version."""
+    build = mocker.spy(indexes, "build")
+    util.portal(client).call(indexes.refresh)
+    build.assert_called_once()
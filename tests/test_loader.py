@@ -0,0 +1,86 @@
+"""Tests for bulk acronym imports."""
+
+
+import io
+import json
+from pathlib import Path
+
+from fakeredis.aioredis import FakeRedis
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+import pytest
+from pytest_mock import MockerFixture
+
+from acronyms import cache, loader, models
+from tests import util
+
+
+def test_load_csv(client: TestClient, tmp_path: Path) -> None:
+    """CSV import skips existing acronyms and indexes new ones for search."""
+    path = tmp_path / "acronyms.csv"
+    path.write_text(
+        "abbreviation,description,phrase\n"
+        "AM,,Ante Meridiem\n"
+        "NASA,,National Aeronautics and Space Administration\n"
+    )
+
+    output = io.StringIO()
+    inserted = util.portal(client).call(loader.load, path, None, 1, output)
+    assert inserted == 1
+    assert "Imported 1 new of 2 read acronyms" in output.getvalue()
+
+    response = client.get("/api/acronym?phrase=aeronautics")
+    response.raise_for_status()
+    assert [acronym["abbreviation"] for acronym in response.json()] == ["NASA"]
+    assert response.json()[0]["description"] is None
+
+
+def test_load_ndjson_duplicates(client: TestClient, tmp_path: Path) -> None:
+    """NDJSON import skips duplicates within a chunk."""
+    acronym = {"abbreviation": "IO", "phrase": "Input Output"}
+    path = tmp_path / "acronyms.ndjson"
+    path.write_text("\n".join(json.dumps(acronym) for _ in range(3)))
+
+    inserted = util.portal(client).call(
+        loader.load, path, None, 10, io.StringIO()
+    )
+    assert inserted == 1
+
+
+def test_load_invalid_chunk(
+    client: TestClient, mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """Import errors are raised even if the cache reset fails after them."""
+    reset = mocker.patch("acronyms.cache.reset", side_effect=OSError)
+    dispose = mocker.spy(type(models.get_engine()), "dispose")
+    path = tmp_path / "acronyms.ndjson"
+    path.write_text(
+        '{"abbreviation": "FW", "phrase": "Firewall"}\n'
+        '{"abbreviation": "", "phrase": "Empty"}\n'
+    )
+
+    with pytest.raises(ValidationError):
+        util.portal(client).call(loader.load, path, None, 1, io.StringIO())
+    reset.assert_called_once()
+    dispose.assert_called_once()
+
+
+@pytest.mark.parametrize("client", [{"cache": "redis"}], indirect=True)
+def test_load_resets_cache(
+    redis: FakeRedis, client: TestClient, tmp_path: Path
+) -> None:
+    """Import evicts cached listings and bumps the data version."""
+    response_1 = client.get("/api/acronym?phrase=firewall")
+    response_1.raise_for_status()
+    assert response_1.json() == []
+    path = tmp_path / "acronyms.ndjson"
+    path.write_text('{"abbreviation": "FW", "phrase": "Firewall"}\n')
+
+    version = util.portal(client).call(cache.registry().version)
+    util.portal(client).call(loader.load, path, None, 10, io.StringIO())
+    assert util.portal(client).call(cache.registry().version) > version
+
+    response_2 = client.get("/api/acronym?phrase=firewall")
+    response_2.raise_for_status()
+    assert [acronym["abbreviation"] for acronym in response_2.json()] == ["FW"]
+    assert response_2.headers["ETag"] != response_1.headers["ETag"]
@@ -0,0 +1,163 @@
+"""Tests for database models and engine configuration."""
+
+
+import asyncio
+from pathlib import Path
+import sqlite3
+import tempfile
+from typing import List, cast
+
+from fastapi.testclient import TestClient
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+import sqlalchemy
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from acronyms import models, settings
+from acronyms.main import app
+from acronyms.typing import PostgresDsn, SqliteDsn
+from tests import util
+
+
+def test_connect_arguments_pgbouncer(mocker: MockerFixture) -> None:
+    """PgBouncer mode disables prepared statement caches."""
+    settings = util.mock_settings(database_pgbouncer=True).model_copy(
+        update={"database": PostgresDsn("postgresql+asyncpg://user@host/db")}
+    )
+    mocker.patch("acronyms.settings.settings", lambda: settings)
+
+    arguments = models.connect_arguments(str(settings.database))
+    assert arguments["prepared_statement_cache_size"] == 0
+    assert arguments["statement_cache_size"] == 0
+    name = arguments["prepared_statement_name_func"]
+    assert name() != name()
+
+
+def test_get_engine_pool(mocker: MockerFixture) -> None:
+    """Engine pool is sized from settings."""
+    settings = util.mock_settings(
+        database_max_overflow=7, database_pool_size=3
+    ).model_copy(
+        update={"database": PostgresDsn("postgresql+asyncpg://user@host/db")}
+    )
+    mocker.patch("acronyms.settings.settings", lambda: settings)
+    models.get_engine.cache_clear()
+
+    engine = models.get_engine()
+    pool = cast(QueuePool, engine.pool)
+    assert pool.size() == 3
+    assert pool._max_overflow == 7
+    models.get_engine.cache_clear()
+
+
+def test_get_engine_sqlite_memory(mocker: MockerFixture) -> None:
+    """In memory SQLite keeps one shared connection across sessions."""
+    settings = util.mock_settings().model_copy(
+        update={"database": SqliteDsn("sqlite+aiosqlite:///:memory:")}
+    )
+    mocker.patch("acronyms.settings.settings", lambda: settings)
+    models.get_engine.cache_clear()
+    models.get_read_engine.cache_clear()
+
+    async def run() -> List[int]:
+        await models.initialize_database()
+
+        async def count() -> int:
+            async with models.create_session() as session:
+                statement = sqlalchemy.select(
+                    sqlalchemy.func.count()
+                ).select_from(models.Acronym)
+                return cast(int, await session.scalar(statement))
+
+        return await asyncio.gather(*(count() for _ in range(10)))
+
+    try:
+        assert isinstance(models.get_engine().pool, StaticPool)
+        assert asyncio.run(run()) == [0] * 10
+    finally:
+        models.get_engine.cache_clear()
+        models.get_read_engine.cache_clear()
+
+
+def test_get_read_engine_query(mocker: MockerFixture, tmp_path: Path) -> None:
+    """Read only SQLite engine keeps query parameters of the database URL."""
+    settings = util.mock_settings(database_sqlite_tuning=True).model_copy(
+        update={
+            "database": SqliteDsn(
+                f"sqlite+aiosqlite:///{tmp_path}/acronyms.db?timeout=7"
+            )
+        }
+    )
+    mocker.patch("acronyms.settings.settings", lambda: settings)
+    models.get_read_engine.cache_clear()
+
+    try:
+        url = models.get_read_engine().url
+        assert url.database == f"file:{tmp_path}/acronyms.db"
+        assert url.query == {"mode": "ro", "timeout": "7", "uri": "true"}
+    finally:
+        models.get_read_engine.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "client", [{"database_sqlite_tuning": True}], indirect=True
+)
+def test_sqlite_tuning(client: TestClient) -> None:
+    """Tuned SQLite uses WAL and serves concurrent writes without locking."""
+
+    async def run() -> List[int]:
+        async with models.get_engine().connect() as connection:
+            mode = await connection.scalar(
+                sqlalchemy.text("PRAGMA journal_mode")
+            )
+            assert mode == "wal"
+
+        transport = httpx.ASGITransport(app=app)  # type: ignore
+        async with httpx.AsyncClient(
+            base_url="http://testserver", transport=transport
+        ) as client_:
+            responses = await asyncio.gather(
+                *(
+                    client_.post(
+                        "/api/acronym",
+                        json={"abbreviation": "T", "phrase": f"Test {index}"},
+                    )
+                    for index in range(20)
+                )
+            )
+        return [response.status_code for response in responses]
+
+    assert util.portal(client).call(run) == [200] * 20
+    assert "mode=ro" in str(models.get_read_engine().url)
+
+    response = client.get("/api/acronyms/lookup?abbreviation=T")
+    assert len(response.json()["abbreviations"]["T"]) == 20
+
+
+REPLICA = Path(tempfile.mkdtemp()) / "replica.db"
+
+
+@pytest.mark.parametrize(
+    "client",
+    [{"database_replicas": [SqliteDsn(f"sqlite+aiosqlite:///{REPLICA}")]}],
+    indirect=True,
+)
+def test_read_replica(client: TestClient) -> None:
+    """Reads go to replicas unless the client wrote recently."""
+    primary = sqlite3.connect(cast(str, settings.settings().database.path)[1:])
+    replica = sqlite3.connect(REPLICA)
+    primary.backup(replica)
+    primary.close()
+    replica.close()
+
+    acronym = {"abbreviation": "NASA", "phrase": "National Aeronautics"}
+    client.post("/api/acronym", json=acronym).raise_for_status()
+    assert "acronyms_primary" in client.cookies
+    response_1 = client.get("/api/acronyms/export?abbreviation=NASA")
+    assert response_1.text != ""
+
+    # Replica is a stale copy, since nothing replicates to it.
+    client.cookies.clear()
+    response_2 = client.get("/api/acronyms/export?abbreviation=NASA")
+    assert response_2.text == ""
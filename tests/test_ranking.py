@@ -0,0 +1,61 @@
+"""Tests for relevance ranking of acronyms."""
+
+
+import random
+
+import pytest
+
+from acronyms import ranking
+from acronyms.ranking import WordIndex
+
+
+def test_word_index_boosts() -> None:
+    """Exact abbreviation hits come before prefix hits and word matches."""
+    index = WordIndex(
+        [
+            (1, "DMV", "Department of Motor Vehicles"),
+            (2, "DM", "Data Mining"),
+            (3, "DS", "Data Science dm"),
+        ]
+    )
+    assert index.search("dm", 10, ["DM", "DMV"]) == [2, 1, 3]
+    assert index.search("data", 10, []) == [2, 3]
+
+
+def test_word_index_remove() -> None:
+    """Removed acronyms leave postings and statistics."""
+    index = WordIndex([(1, "DM", "Data Mining")])
+    index.add(2, "DS", "Data Science")
+    index.remove(1, "Data Mining")
+
+    assert index.search("data", 10, []) == [2]
+    assert index.search("mining", 10, []) == []
+    assert index.total == 2
+    assert "mining" not in index.postings
+
+
+def test_word_index_top() -> None:
+    """Walks that stop early return the best acronyms of a full scoring."""
+    generator = random.Random(0)
+    vocabulary = [f"w{number}" for number in range(20)]
+    index = WordIndex()
+    for id_ in range(2000):
+        length = generator.randint(1, 8)
+        text = " ".join(generator.choices(vocabulary, k=length))
+        index.add(id_, f"A{id_}", text)
+
+    for query in ["w1", "w2 w3", "w4 w5 w6", "w7 w7"]:
+        words = ranking.words(query)
+        weights = {word: index.weight(word) for word in set(words)}
+        scores = sorted(
+            (
+                index.score(id_, weights)
+                for id_ in index.documents
+                if index.matches(id_, words)
+            ),
+            reverse=True,
+        )
+        results = index.search(query, 10, [])
+        assert [index.score(id_, weights) for id_ in results] == pytest.approx(
+            scores[:10]
+        )
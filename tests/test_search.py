@@ -0,0 +1,59 @@
+"""Tests for acronym search engine."""
+
+
+from typing import Set
+
+from fastapi.testclient import TestClient
+from pytest_mock import MockerFixture
+import sqlalchemy
+
+from acronyms import models, search, settings
+from tests import util
+
+
+def test_match_query() -> None:
+    """Search terms are converted to column prefix queries."""
+    query = search.match_query("phrase", "Data Min")
+    assert query == 'phrase : ("Data"* "Min"*)'
+
+
+def test_match_query_punctuation() -> None:
+    """Terms without words have no match query."""
+    assert search.match_query("phrase", "-- ") is None
+
+
+def test_substring_query() -> None:
+    """Search terms are quoted as trigram substring queries on a column."""
+    query = search.substring_query("phrase", 'ta "mi')
+    assert query == 'phrase : "ta ""mi"'
+
+
+def test_substring_query_unsupported() -> None:
+    """Short terms and terms with wildcards have no trigram query."""
+    assert search.substring_query("abbreviation", "DM") is None
+    assert search.substring_query("phrase", "da%ta") is None
+
+
+def test_initialize_index(client: TestClient, mocker: MockerFixture) -> None:
+    """Only search tables and triggers of the search mode are kept."""
+
+    async def names() -> Set[str]:
+        async with models.get_engine().connect() as connection:
+            result = await connection.execute(
+                sqlalchemy.text(
+                    "SELECT name FROM sqlite_master WHERE name IN ("
+                    "'acronyms_fts', 'acronyms_fts_insert', "
+                    "'acronyms_trigram', 'acronyms_trigram_insert')"
+                )
+            )
+            return set(result.scalars())
+
+    portal = util.portal(client)
+    assert portal.call(names) == {"acronyms_trigram", "acronyms_trigram_insert"}
+    for mode, expected in [
+        ("fts", {"acronyms_fts", "acronyms_fts_insert"}),
+        ("contains", set()),
+    ]:
+        mocker.patch.object(settings.settings(), "search", mode)
+        portal.call(search.initialize_index)
+        assert portal.call(names) == expected
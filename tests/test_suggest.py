@@ -0,0 +1,32 @@
+"""Tests for acronym autocompletion index."""
+
+
+from acronyms import suggest
+from acronyms.suggest import PrefixIndex
+
+
+def test_prefix_index_duplicates() -> None:
+    """Shared values stay suggested until their last key is removed."""
+    index = PrefixIndex([("dm", "DM"), ("ds", "DS")])
+    index.add(["dm"], "DM")
+    assert index.complete("d", 10) == ["DM", "DS"]
+
+    index.remove(["dm"], "DM")
+    assert index.complete("d", 10) == ["DM", "DS"]
+    index.remove(["dm"], "DM")
+    assert index.complete("d", 10) == ["DS"]
+
+
+def test_prefix_index_buckets() -> None:
+    """Entries stay sorted while buckets split and empty."""
+    size = suggest.BUCKET_SIZE
+    index = PrefixIndex()
+    for number in reversed(range(3 * size)):
+        index.add([f"k{number:05d}"], str(number))
+    assert len(index.buckets) > 1
+    assert index.complete("k0000", 3) == ["0", "1", "2"]
+
+    for number in range(3 * size - 1):
+        index.remove([f"k{number:05d}"], str(number))
+    assert index.complete("k", 3) == [str(3 * size - 1)]
+    assert len(index.buckets) == 1
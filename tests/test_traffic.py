@@ -0,0 +1,60 @@
+"""Tests for the frontend traffic load generator."""
+
+
+from fastapi.testclient import TestClient
+import httpx
+
+from acronyms import traffic
+from acronyms.traffic import Profile, Report, Route
+from tests import util
+
+
+def test_breaches() -> None:
+    """Routes missing latency or error objectives are reported."""
+    report = Report()
+    report.routes["GET /api/acronym"] = Route()
+    report.routes["POST /api/acronym"] = Route()
+    for index in range(100):
+        report.routes["GET /api/acronym"].record(index / 100, True)
+        report.routes["POST /api/acronym"].record(0.001, index != 0)
+    profile = Profile(slo_errors=0.5, slo_p95=500, slo_p99=2000)
+
+    assert report.breaches(profile) == [
+        "GET /api/acronym p95 940.5 ms exceeds 500.0 ms",
+        "POST /api/acronym error rate 1.00% exceeds 0.5%",
+    ]
+
+
+def test_simulate(client: TestClient) -> None:
+    """Virtual users search, flip pages, edit and log in without errors."""
+    profile = Profile(
+        debounce=0.02,
+        duration=0.5,
+        edit_rate=1,
+        keystroke=0.01,
+        login_rate=1,
+        ramp=0.1,
+        think=0.01,
+        users=4,
+    )
+
+    async def simulate() -> Report:
+        transport = httpx.ASGITransport(app=client.app)  # type: ignore
+        async with httpx.AsyncClient(
+            base_url="http://testserver", transport=transport
+        ) as client_:
+            return await traffic.simulate(client_, profile, seed=0)
+
+    report = util.portal(client).call(simulate)
+
+    assert {
+        "DELETE /api/acronym/{id}",
+        "GET /api/acronym",
+        "GET /users/me",
+        "POST /api/acronym",
+        "POST /auth/login",
+        "POST /auth/register",
+        "PUT /api/acronym/{id}",
+    } == set(report.routes)
+    assert all(route.errors == 0 for route in report.routes.values())
+    assert "GET /api/acronym" in report.render()
@@ -9,8 +9,10 @@ import socket
 import subprocess
 from subprocess import Popen
 import tempfile
-from typing import Dict, Optional, Tuple, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+from aiosmtpd.smtp import SMTP, AuthResult, Envelope, Session
+from anyio.from_thread import BlockingPortal
 from fastapi.testclient import TestClient
 import httpx
 from httpx import Client, HTTPTransport
@@ -22,6 +24,34 @@ from acronyms.typing import SqliteDsn
 DATA_PATH = Path(__file__).parent / "data"
 
 
+class Mailbox:
+    """Local SMTP server handler that records received email."""
+
+    def __init__(self, failures: int = 0) -> None:
+        """Create handler that rejects the first failures messages."""
+        self.envelopes: List[Envelope] = []
+        self.failures = failures
+        self.sessions: List[Session] = []
+
+    async def handle_DATA(  # noqa: N802
+        self, server: SMTP, session: Session, envelope: Envelope
+    ) -> str:
+        """Accept message unless a temporary failure is due."""
+        if self.failures > 0:
+            self.failures -= 1
+            return "451 Temporary failure"
+
+        self.envelopes.append(envelope)
+        if not any(session is session_ for session_ in self.sessions):
+            self.sessions.append(session)
+        return "250 OK"
+
+
+def authenticate(*args: Any) -> AuthResult:
+    """Accept every SMTP login."""
+    return AuthResult(success=True)
+
+
 def clear_acronyms(server: str) -> None:
     """Remove all acronyms from server."""
     response = httpx.get(f"{server}/api/acronym")
@@ -40,7 +70,7 @@ def find_port() -> int:
     return cast(int, sock.getsockname()[1])
 
 
-def mock_settings() -> Settings:
+def mock_settings(**kwargs: Any) -> Settings:
     """Generate application settings for test suite."""
     sqlite_path = Path(tempfile.mkdtemp()) / "acronyms_test.db"
     database = SqliteDsn(f"sqlite+aiosqlite:///{sqlite_path}")
@@ -60,9 +90,15 @@ def mock_settings() -> Settings:
         smtp_tls=False,
         smtp_username="admin.user@mail.com",
         verification_token=secrets.token_urlsafe(64),
+        **kwargs,
     )
 
 
+def portal(client: TestClient) -> BlockingPortal:
+    """Get event loop portal of a started test client."""
+    return cast(BlockingPortal, client.portal)
+
+
 def popen_stdio(process: Popen, file: str = "stdout") -> str:
     """Terminate process and get its IO."""
     process.terminate()